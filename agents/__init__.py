@@ -1,17 +1,47 @@
 # Agents package
-from .research_agent import ResearchAgent
-from .models.research_models import ResearchInput, ResearchOutput, SearchResult
-from .langfuse_config import get_langfuse_handler, get_langfuse_callbacks
-from .gemini_agent_basic import GeminiAgentBasic
-from .model_basic import ModelBasic
+#
+# Exports are resolved on first access (PEP 562), so importing a light submodule
+# such as agents.models.research_models does not load every agent and its SDK.
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Maps each exported name to the submodule defining it
+_EXPORTS = {
+    "ResearchAgent": ".research_agent",
+    "ResearchInput": ".models.research_models",
+    "ResearchOutput": ".models.research_models",
+    "SearchResult": ".models.research_models",
+    "get_langfuse_handler": ".langfuse_config",
+    "get_langfuse_callbacks": ".langfuse_config",
+    "GeminiAgentBasic": ".gemini_agent_basic",
+    "ModelBasic": ".model_basic",
+}
+
+if TYPE_CHECKING:
+    from .research_agent import ResearchAgent
+    from .models.research_models import ResearchInput, ResearchOutput, SearchResult
+    from .langfuse_config import get_langfuse_handler, get_langfuse_callbacks
+    from .gemini_agent_basic import GeminiAgentBasic
+    from .model_basic import ModelBasic
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
 
 __all__ = [
     "ResearchAgent",
-    "ResearchInput", 
+    "ResearchInput",
     "ResearchOutput",
     "SearchResult",
     "get_langfuse_handler",
     "get_langfuse_callbacks",
     "GeminiAgentBasic",
     "ModelBasic"
-] 
\ No newline at end of file
+]
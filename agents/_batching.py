@@ -0,0 +1,70 @@
+"""
+Length-binned concurrent batching for the chat agents.
+Short requests get a wide concurrency window and long ones a narrow one,
+so a few long decodes do not hold up everything else in the batch.
+"""
+
+import asyncio
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, TypeVar, Union
+from langchain_core.messages import BaseMessage
+
+T = TypeVar("T")
+
+# Upper bounds (in characters) of every bucket but the last
+DEFAULT_BUCKET_EDGES = (512, 2048, 8192)
+# Maximum in-flight requests per bucket, shortest bucket first
+DEFAULT_BUCKET_CONCURRENCY = (32, 16, 8, 4)
+
+def message_length(messages: List[Union[BaseMessage, Dict[str, Any]]]) -> int:
+    """Returns the total text length of a message list."""
+    total = 0
+    for msg in messages:
+        if isinstance(msg, dict):
+            content = msg.get("content", "")
+        elif isinstance(msg, BaseMessage):
+            content = msg.content
+        elif isinstance(msg, tuple) and len(msg) == 2:
+            content = msg[1]
+        else:
+            content = msg
+        total += len(content) if isinstance(content, str) else len(str(content))
+    return total
+
+async def gather_length_binned(
+    batch: List[List[Union[BaseMessage, Dict[str, Any]]]],
+    ainvoke: Callable[[List[Union[BaseMessage, Dict[str, Any]]]], Awaitable[T]],
+    bucket_edges: Sequence[int] = DEFAULT_BUCKET_EDGES,
+    bucket_concurrency: Sequence[int] = DEFAULT_BUCKET_CONCURRENCY,
+) -> List[T]:
+    """
+    Runs ainvoke over every message list with per-length-bucket concurrency limits.
+
+    Args:
+        batch (List[List[Union[BaseMessage, Dict[str, Any]]]]): The message lists to run.
+        ainvoke (Callable): Coroutine function invoked with each message list.
+        bucket_edges (Sequence[int]): Ascending length boundaries between buckets.
+        bucket_concurrency (Sequence[int]): Concurrency limit of each bucket, one more
+            entry than bucket_edges.
+
+    Returns:
+        List[T]: The results, in the same order as batch.
+    """
+    if len(bucket_concurrency) != len(bucket_edges) + 1:
+        raise ValueError("bucket_concurrency needs exactly one entry more than bucket_edges")
+
+    semaphores = [asyncio.Semaphore(limit) for limit in bucket_concurrency]
+    buckets = [bisect_left(bucket_edges, message_length(messages)) for messages in batch]
+
+    async def _run(index: int) -> T:
+        async with semaphores[buckets[index]]:
+            return await ainvoke(batch[index])
+
+    # Start the shortest buckets first so they retire early
+    order = sorted(range(len(batch)), key=buckets.__getitem__)
+    results = await asyncio.gather(*(_run(index) for index in order))
+
+    ordered: List[Any] = [None] * len(batch)
+    for index, result in zip(order, results):
+        ordered[index] = result
+    return ordered
@@ -0,0 +1,278 @@
+"""
+Behaviour shared by the chat agents: sync, async, streaming and batched
+completions with response caching. Subclasses only build the chat model.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Union, Dict, Any, Tuple, Optional, Sequence
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from .langfuse_config import get_langfuse_callbacks
+from ._batching import gather_length_binned, DEFAULT_BUCKET_EDGES, DEFAULT_BUCKET_CONCURRENCY
+from ._message_utils import convert_messages, extract_response_metadata
+from ._response_cache import ResponseCache, CACHE_MAX_TEMPERATURE
+
+logger = logging.getLogger(__name__)
+
+class ChatAgentBase:
+    def __init__(self, llm: BaseChatModel, model_provider: str, model_name: str, temperature: float, top_p: float, merge_same_role: bool = True):
+        """
+        Sets up the state shared by the chat agents around an already built chat model.
+
+        Args:
+            llm (BaseChatModel): The Langchain chat model to invoke.
+            model_provider (str): The provider of the model, used in logs and cache keys.
+            model_name (str): The name of the model, used in cache keys.
+            temperature (float): The temperature of the model's output.
+            top_p (float): The top_p (nucleus sampling) parameter of the model's output.
+            merge_same_role (bool): Whether to merge adjacent same-role text messages
+                before sending them. Disable it when turn boundaries must be preserved.
+        """
+        self.llm = llm
+        self.model_provider = model_provider
+
+        # Resolve Langfuse callbacks once; the invoke config is reused for every call
+        try:
+            callbacks = get_langfuse_callbacks()
+        except Exception as e:
+            logger.warning("Failed to get Langfuse callbacks: %s", e)
+            callbacks = []
+        self._invoke_config: Optional[Dict[str, Any]] = {"callbacks": callbacks} if callbacks else None
+
+        self.merge_same_role = merge_same_role
+
+        # Identical requests are served from cache for near-deterministic settings
+        self._cache: Optional[ResponseCache] = None
+        if temperature <= CACHE_MAX_TEMPERATURE:
+            self._cache = ResponseCache({"provider": model_provider, "model": model_name, "t": temperature, "p": top_p})
+
+    def invoke_completion_with_metadata(self, messages: List[Union[BaseMessage, Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Invokes the AI model with a list of messages and returns both response content and metadata.
+
+        Args:
+            messages (List[Union[BaseMessage, Dict[str, Any]]]): A list of messages, 
+                where each message can be an instance of a Langchain BaseMessage 
+                (HumanMessage, AIMessage, SystemMessage) or a dictionary 
+                with "role" and "content" keys.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The AI's response content and metadata containing usage info.
+        """
+        if not messages:
+            return "No messages provided.", {}
+
+        langchain_messages = convert_messages(messages, merge_same_role=self.merge_same_role)
+
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._cache.key_for(langchain_messages)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = self.llm.invoke(langchain_messages, config=self._invoke_config)
+            
+            result = response.content or "", extract_response_metadata(response)
+            if cache_key is not None:
+                self._cache.set(cache_key, result)  # type: ignore
+            return result  # type: ignore
+        except Exception:
+            # Basic error handling
+            logger.exception("Error invoking %s model", self.model_provider)
+            return "An error occurred while processing your request.", {}
+
+    def invoke_completion(self, messages: List[Union[BaseMessage, Dict[str, Any]]]) -> str:
+        """
+        Invokes the AI model with a list of messages and returns the response.
+
+        Args:
+            messages (List[Union[BaseMessage, Dict[str, Any]]]): A list of messages, 
+                where each message can be an instance of a Langchain BaseMessage 
+                (HumanMessage, AIMessage, SystemMessage) or a dictionary 
+                with "role" and "content" keys.
+
+        Returns:
+            str: The AI's response content.
+        """
+        # The response cache stores metadata too, so cached agents take the full path
+        if self._cache is not None:
+            content, _ = self.invoke_completion_with_metadata(messages)
+            return content
+
+        if not messages:
+            return "No messages provided."
+
+        langchain_messages = convert_messages(messages, merge_same_role=self.merge_same_role)
+        try:
+            response = self.llm.invoke(langchain_messages, config=self._invoke_config)
+            return response.content or ""
+        except Exception:
+            logger.exception("Error invoking %s model", self.model_provider)
+            return "An error occurred while processing your request."
+
+    async def ainvoke_completion_with_metadata(self, messages: List[Union[BaseMessage, Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Asynchronously invokes the AI model with a list of messages and returns both response content and metadata.
+
+        Awaiting the provider call instead of blocking lets callers run several
+        completions concurrently (e.g. with asyncio.gather).
+
+        Args:
+            messages (List[Union[BaseMessage, Dict[str, Any]]]): A list of messages, 
+                where each message can be an instance of a Langchain BaseMessage 
+                (HumanMessage, AIMessage, SystemMessage) or a dictionary 
+                with "role" and "content" keys.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The AI's response content and metadata containing usage info.
+        """
+        if not messages:
+            return "No messages provided.", {}
+
+        langchain_messages = convert_messages(messages, merge_same_role=self.merge_same_role)
+
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._cache.key_for(langchain_messages)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = await self.llm.ainvoke(langchain_messages, config=self._invoke_config)
+            
+            result = response.content or "", extract_response_metadata(response)
+            if cache_key is not None:
+                self._cache.set(cache_key, result)  # type: ignore
+            return result  # type: ignore
+        except Exception:
+            # Basic error handling
+            logger.exception("Error invoking %s model", self.model_provider)
+            return "An error occurred while processing your request.", {}
+
+    async def ainvoke_completion(self, messages: List[Union[BaseMessage, Dict[str, Any]]]) -> str:
+        """
+        Asynchronously invokes the AI model with a list of messages and returns the response.
+
+        Args:
+            messages (List[Union[BaseMessage, Dict[str, Any]]]): A list of messages, 
+                where each message can be an instance of a Langchain BaseMessage 
+                (HumanMessage, AIMessage, SystemMessage) or a dictionary 
+                with "role" and "content" keys.
+
+        Returns:
+            str: The AI's response content.
+        """
+        # The response cache stores metadata too, so cached agents take the full path
+        if self._cache is not None:
+            content, _ = await self.ainvoke_completion_with_metadata(messages)
+            return content
+
+        if not messages:
+            return "No messages provided."
+
+        langchain_messages = convert_messages(messages, merge_same_role=self.merge_same_role)
+        try:
+            response = await self.llm.ainvoke(langchain_messages, config=self._invoke_config)
+            return response.content or ""
+        except Exception:
+            logger.exception("Error invoking %s model", self.model_provider)
+            return "An error occurred while processing your request."
+
+    async def astream_completion(self, messages: List[Union[BaseMessage, Dict[str, Any]]]) -> AsyncIterator[str]:
+        """
+        Asynchronously streams the AI's response text as the model generates it.
+
+        Args:
+            messages (List[Union[BaseMessage, Dict[str, Any]]]): A list of messages, 
+                where each message can be an instance of a Langchain BaseMessage 
+                (HumanMessage, AIMessage, SystemMessage) or a dictionary 
+                with "role" and "content" keys.
+
+        Yields:
+            str: Successive pieces of the AI's response content.
+        """
+        if not messages:
+            yield "No messages provided."
+            return
+
+        langchain_messages = convert_messages(messages, merge_same_role=self.merge_same_role)
+
+        if self._cache is not None:
+            cached = self._cache.get(self._cache.key_for(langchain_messages))
+            if cached is not None:
+                yield cached[0]
+                return
+
+        try:
+            async for chunk in self.llm.astream(langchain_messages, config=self._invoke_config):
+                if chunk.content:
+                    yield chunk.content
+        except Exception:
+            logger.exception("Error invoking %s model", self.model_provider)
+            yield "An error occurred while processing your request."
+
+    def batch_completion(self, batch: List[List[Union[BaseMessage, Dict[str, Any]]]]) -> List[str]:
+        """
+        Runs several independent completions concurrently and returns their responses in order.
+
+        This starts its own event loop, so it must not be called from a running one
+        (use batch_invoke, or await the ainvoke_* methods with asyncio.gather there instead).
+
+        Args:
+            batch (List[List[Union[BaseMessage, Dict[str, Any]]]]): A list of message lists, 
+                one per completion.
+
+        Returns:
+            List[str]: The AI's response content for each message list.
+        """
+        return asyncio.run(self.abatch_invoke(batch))
+
+    async def abatch_invoke(
+        self,
+        batch: List[List[Union[BaseMessage, Dict[str, Any]]]],
+        bucket_edges: Sequence[int] = DEFAULT_BUCKET_EDGES,
+        bucket_concurrency: Sequence[int] = DEFAULT_BUCKET_CONCURRENCY,
+    ) -> List[str]:
+        """
+        Asynchronously runs several independent completions, grouped by input length.
+
+        Each length bucket gets its own concurrency limit (wide for short inputs,
+        narrow for long ones), so long requests do not block the short ones.
+
+        Args:
+            batch (List[List[Union[BaseMessage, Dict[str, Any]]]]): A list of message lists, 
+                one per completion.
+            bucket_edges (Sequence[int]): Ascending character-length boundaries between buckets.
+            bucket_concurrency (Sequence[int]): Concurrency limit of each bucket, shortest first.
+
+        Returns:
+            List[str]: The AI's response content for each message list, in input order.
+        """
+        return await gather_length_binned(batch, self.ainvoke_completion, bucket_edges, bucket_concurrency)
+
+    def batch_invoke(self, batch: List[List[Union[BaseMessage, Dict[str, Any]]]]) -> List[str]:
+        """
+        Runs several independent completions on a thread pool and returns their responses in order.
+
+        Unlike batch_completion this does not need its own event loop, so it can be
+        called from synchronous code running inside one.
+
+        Args:
+            batch (List[List[Union[BaseMessage, Dict[str, Any]]]]): A list of message lists, 
+                one per completion.
+
+        Returns:
+            List[str]: The AI's response content for each message list.
+        """
+        if not batch:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(32, len(batch))) as executor:
+            # Submit everything before collecting anything, otherwise the calls run one by one
+            futures = [executor.submit(self.invoke_completion, messages) for messages in batch]
+            return [future.result() for future in futures]
@@ -0,0 +1,66 @@
+"""
+Duplicate filtering for web search results.
+Overlapping queries often return the same pages; dropping them before analysis
+saves the LLM tokens they would cost.
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List
+
+# Maximum Hamming distance between content fingerprints treated as near-duplicates
+DEFAULT_SIMHASH_DISTANCE = 3
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def simhash64(text: str) -> int:
+    """Returns the 64-bit SimHash fingerprint of the words in text."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return 0
+
+    # Hash each distinct word once, as a 64-character bit string
+    bit_strings = {
+        token: format(int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big"), "064b")
+        for token in set(tokens)
+    }
+
+    # A bit is set when most word occurrences have it set; zip transposes the
+    # bit strings so each column is counted in C rather than bit by bit
+    majority = len(tokens) / 2
+    fingerprint = 0
+    for column in zip(*(bit_strings[token] for token in tokens)):
+        fingerprint = (fingerprint << 1) | (column.count("1") > majority)
+    return fingerprint
+
+def dedupe_documents(documents: List[Dict[str, Any]],
+                     max_distance: int = DEFAULT_SIMHASH_DISTANCE) -> List[Dict[str, Any]]:
+    """
+    Drops search results without a URL, repeated URLs, and near-duplicate content.
+
+    Args:
+        documents (List[Dict[str, Any]]): Raw search results, in ranking order.
+        max_distance (int): Content fingerprints within this Hamming distance of an
+            earlier result count as duplicates. Negative disables the content check.
+
+    Returns:
+        List[Dict[str, Any]]: The first occurrence of every distinct result, in order.
+    """
+    seen_urls = set()
+    fingerprints: List[int] = []
+    deduped = []
+    for doc in documents:
+        url = doc.get("url")
+        if not url or url in seen_urls:
+            continue
+        seen_urls.add(url)
+
+        content = doc.get("content")
+        if content and max_distance >= 0:
+            fingerprint = simhash64(content)
+            if any((fingerprint ^ other).bit_count() <= max_distance for other in fingerprints):
+                continue
+            fingerprints.append(fingerprint)
+
+        deduped.append(doc)
+    return deduped
@@ -0,0 +1,111 @@
+"""
+Helpers for converting chat messages into Langchain message objects.
+"""
+
+from typing import Any, Dict, List, Union
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
+
+# Maps a dict message "role" to its Langchain message class
+_ROLE_MAP = {"user": HumanMessage, "assistant": AIMessage, "system": SystemMessage}
+
+# Message classes whose adjacent instances can be folded into one
+_MERGEABLE_TYPES = (HumanMessage, AIMessage, SystemMessage)
+
+# Returned when a response has no metadata; shared, so never mutate it
+_EMPTY: Dict[str, Any] = {}
+
+def convert_messages(
+    messages: List[Union[BaseMessage, Dict[str, Any]]],
+    _map=_ROLE_MAP,
+    _Base=BaseMessage,
+    _H=HumanMessage,
+    merge_same_role: bool = False,
+) -> List[BaseMessage]:
+    """
+    Converts a list of messages into Langchain message objects.
+
+    The role lookup is a single dict probe and the defaulted arguments keep the
+    hot names in fast locals, which matters for long chat histories.
+
+    Args:
+        messages (List[Union[BaseMessage, Dict[str, Any]]]): A list of messages,
+            where each message can be an instance of a Langchain BaseMessage
+            (HumanMessage, AIMessage, SystemMessage), a dictionary
+            with "role" and "content" keys, or a (role, content) tuple.
+        merge_same_role (bool): If True, adjacent messages of the same role with
+            plain text content are joined with blank lines into one message,
+            which saves the per-message overhead tokens on long histories.
+
+    Returns:
+        List[BaseMessage]: The converted Langchain messages.
+    """
+    out: List[BaseMessage] = []
+    append = out.append
+    for m in messages:
+        if isinstance(m, dict):
+            message_cls = _map.get(m.get("role"))
+            if message_cls is not None:
+                append(message_cls(content=m.get("content", "")))
+            else:
+                # Fallback for unknown roles in dicts, treat as human message
+                append(_H(content=str(m)))
+        elif isinstance(m, _Base):
+            append(m)  # Already a Langchain message object
+        elif isinstance(m, tuple) and len(m) == 2:
+            # Packed (role, content) pair, e.g. utils.logging_utils.Message
+            role, content = m
+            message_cls = _map.get(role)
+            append(message_cls(content=content) if message_cls is not None else _H(content=str(content)))
+        else:
+            # Fallback for other types (e.g. simple strings), treat as human message
+            append(_H(content=str(m)))
+    return _merge_same_role(out) if merge_same_role else out
+
+def _is_plain_text(m: BaseMessage) -> bool:
+    """Whether m carries only string content, so rebuilding it from content loses nothing."""
+    return (
+        isinstance(m.content, str)
+        and not getattr(m, "tool_calls", None)
+        and not getattr(m, "invalid_tool_calls", None)
+        and not m.additional_kwargs
+    )
+
+def _merge_same_role(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Folds runs of adjacent same-type plain text messages into single messages."""
+    merged: List[BaseMessage] = []
+    for m in messages:
+        if merged:
+            prev = merged[-1]
+            message_cls = type(m)
+            # Tool calls, extra kwargs and names are kept by leaving such messages as they are
+            if (
+                type(prev) is message_cls
+                and message_cls in _MERGEABLE_TYPES
+                and prev.name == m.name
+                and _is_plain_text(prev)
+                and _is_plain_text(m)
+            ):
+                merged[-1] = message_cls(content=prev.content + "\n\n" + m.content, name=m.name)
+                continue
+        merged.append(m)
+    return merged
+
+def extract_response_metadata(response: Any) -> Dict[str, Any]:
+    """
+    Extracts the response and usage metadata from a Langchain response message.
+
+    Args:
+        response (Any): The message returned by the chat model.
+
+    Returns:
+        Dict[str, Any]: The response metadata, with usage info under "usage_metadata".
+            When the response carries no metadata at all the shared _EMPTY dict is
+            returned, which callers must treat as read-only.
+    """
+    metadata = getattr(response, 'response_metadata', None)
+    usage = getattr(response, 'usage_metadata', None)
+    if usage:
+        if not metadata:
+            metadata = {}
+        metadata['usage_metadata'] = usage
+    return metadata or _EMPTY
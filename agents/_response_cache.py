@@ -0,0 +1,63 @@
+"""
+Exact-match response cache for the chat agents.
+Avoids repeated provider calls for byte-identical requests.
+"""
+
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+from cachetools import TTLCache
+from langchain_core.messages import BaseMessage
+
+# Above this temperature responses are expected to vary between calls,
+# so serving a cached answer would hide that variation.
+CACHE_MAX_TEMPERATURE = 0.3
+
+class ResponseCache:
+    """Thread-safe TTL cache of (content, metadata) pairs keyed by request hash."""
+
+    def __init__(self, model_params: Dict[str, Any], maxsize: int = 1000, ttl: float = 3600):
+        """
+        Initializes the response cache.
+
+        Args:
+            model_params (Dict[str, Any]): Model settings that are part of every key
+                (provider, model name, temperature, top_p).
+            maxsize (int): Maximum number of cached responses.
+            ttl (float): Time to live of each entry, in seconds.
+        """
+        self._model_params = model_params
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def key_for(self, messages: List[BaseMessage]) -> str:
+        """Builds the cache key for a list of Langchain messages."""
+        serialized = [(msg.type, msg.content) for msg in messages]
+        key_data = {"msgs": serialized, **self._model_params}
+        # orjson emits bytes directly; a 16-byte blake2b digest is ample for an in-process key
+        key_bytes = orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Returns the cached (content, metadata) pair, or None on a miss.
+
+        The metadata is a fresh copy marked "cached": True and without
+        usage_metadata, since a hit spends no tokens and must not be reported
+        as if it did.
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None:
+            return None
+        content, metadata = entry
+        hit_metadata = {k: v for k, v in metadata.items() if k != "usage_metadata"}
+        hit_metadata["cached"] = True
+        return content, hit_metadata
+
+    def set(self, key: str, value: Tuple[str, Dict[str, Any]]) -> None:
+        """Stores a copy of a (content, metadata) pair, so later changes by the caller do not leak in."""
+        content, metadata = value
+        with self._lock:
+            self._cache[key] = (content, dict(metadata))
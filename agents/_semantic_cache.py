@@ -0,0 +1,69 @@
+"""
+Semantic cache for research results.
+Serves a stored ResearchOutput when a new request embeds close enough to a previous one.
+"""
+
+import math
+import operator
+import os
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+
+from .models.research_models import ResearchOutput
+
+# Cosine similarity above which two requests are treated as the same research
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+
+def _normalize(vector: List[float]) -> List[float]:
+    """Scales a vector to unit length so a dot product is its cosine similarity."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+class SemanticCache:
+    """FIFO-bounded store of (unit embedding, ResearchOutput) pairs searched by cosine similarity."""
+
+    def __init__(self, embeddings: Optional[Embeddings] = None,
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD, maxsize: int = 256):
+        """
+        Initializes the semantic cache.
+
+        Args:
+            embeddings (Optional[Embeddings]): Embedding model for cache keys. Defaults to
+                the Gemini text-embedding-004 model.
+            threshold (float): Minimum cosine similarity for a cache hit.
+            maxsize (int): Maximum number of stored results; the oldest is evicted first.
+        """
+        if embeddings is None:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            embeddings = GoogleGenerativeAIEmbeddings(
+                model="models/text-embedding-004",
+                google_api_key=os.getenv("GEMINI_API_KEY")
+            )
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self._entries: Deque[Tuple[List[float], ResearchOutput]] = deque(maxlen=maxsize)
+
+    async def alookup(self, text: str) -> Tuple[List[float], Optional[ResearchOutput]]:
+        """
+        Embeds text and returns the closest stored result if it clears the threshold.
+
+        Returns:
+            Tuple[List[float], Optional[ResearchOutput]]: The unit embedding of text (pass it
+                to add() on a miss) and the cached output, or None on a miss.
+        """
+        vector = _normalize(await self.embeddings.aembed_query(text))
+
+        best_score, best_output = -1.0, None
+        for stored, output in self._entries:
+            score = sum(map(operator.mul, stored, vector))
+            if score > best_score:
+                best_score, best_output = score, output
+
+        if best_score >= self.threshold:
+            return vector, best_output
+        return vector, None
+
+    def add(self, vector: List[float], output: ResearchOutput) -> None:
+        """Stores a result under the unit embedding returned by alookup()."""
+        self._entries.append((vector, output))
@@ -3,11 +3,14 @@ Langfuse configuration module for the agents package.
 Provides a centralized way to configure and use Langfuse for LLM observability.
 """
 
+import logging
 import os
 from typing import Optional
 from langfuse.callback import CallbackHandler
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 class LangfuseConfig:
     """Singleton class to manage Langfuse configuration."""
     
@@ -22,8 +25,9 @@ class LangfuseConfig:
     def __init__(self):
         """Initialize Langfuse configuration if not already done."""
         if self._handler is None:
-            # Load environment variables first
-            load_dotenv(dotenv_path=".env.local", override=True)
+            # Load environment variables first, unless the process already has them
+            if os.getenv("LANGFUSE_SECRET_KEY") is None:
+                load_dotenv(dotenv_path=".env.local", override=True)
             self._initialize_handler()
     
     def _initialize_handler(self) -> None:
@@ -34,15 +38,13 @@ class LangfuseConfig:
             host = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
             
             if not secret_key or not public_key:
-                print("Warning: Langfuse credentials not found in environment variables.")
-                print("Please check LANGFUSE_SECRET_KEY and LANGFUSE_API_KEY in .env.local")
+                logger.warning("Langfuse credentials not found in environment variables. "
+                               "Please check LANGFUSE_SECRET_KEY and LANGFUSE_API_KEY in .env.local")
                 self._handler = None
                 return
             
-            print(f"Initializing Langfuse with:")
-            print(f"  Host: {host}")
-            print(f"  Public Key: {public_key[:10]}...")
-            print(f"  Secret Key: {secret_key[:10]}...")
+            logger.debug("Initializing Langfuse with host=%s public_key=%s... secret_key=%s...",
+                         host, public_key[:10], secret_key[:10])
             
             self._handler = CallbackHandler(
                 secret_key=secret_key,
@@ -50,18 +52,10 @@ class LangfuseConfig:
                 host=host,
                 debug=False  # Disable debug mode to reduce console output
             )
-            print(f"Langfuse handler initialized successfully with host: {host}")
-            
-            # Test the connection
-            try:
-                # Try to flush any pending traces to test connectivity
-                self._handler.langfuse.flush()
-                print("Langfuse connection test successful")
-            except Exception as e:
-                print(f"Warning: Langfuse connection test failed: {e}")
+            logger.info("Langfuse handler initialized successfully with host: %s", host)
             
         except Exception as e:
-            print(f"Error initializing Langfuse handler: {e}")
+            logger.error("Error initializing Langfuse handler: %s", e)
             self._handler = None
     
     def get_handler(self) -> Optional[CallbackHandler]:
@@ -72,19 +66,29 @@ class LangfuseConfig:
         """Check if Langfuse is properly configured and enabled."""
         return self._handler is not None
 
-# Create a global instance
-langfuse_config = LangfuseConfig()
+# Global instance and callbacks list, created on first use so importing
+# the agents package does not load credentials or build a Langfuse client
+_cfg: Optional[LangfuseConfig] = None
+_CALLBACKS: Optional[list] = None
 
 def get_langfuse_handler() -> Optional[CallbackHandler]:
     """Convenience function to get the Langfuse handler."""
-    return langfuse_config.get_handler()
+    global _cfg
+    _cfg = _cfg or LangfuseConfig()
+    return _cfg.get_handler()
 
 def get_langfuse_callbacks() -> list:
-    """Get a list containing the Langfuse callback handler, or empty list if not configured."""
-    handler = get_langfuse_handler()
-    if handler:
-        print("Langfuse callback handler added to LLM call")
-        return [handler]
-    else:
-        print("No Langfuse handler available, skipping tracing")
-        return [] 
\ No newline at end of file
+    """
+    Get a list containing the Langfuse callback handler, or empty list if not configured.
+
+    The same list object is returned on every call; callers must not mutate it.
+    """
+    global _CALLBACKS
+    if _CALLBACKS is None:
+        handler = get_langfuse_handler()
+        _CALLBACKS = [handler] if handler else []
+        if _CALLBACKS:
+            logger.debug("Langfuse callback handler will be added to LLM calls")
+        else:
+            logger.debug("No Langfuse handler available, skipping tracing")
+    return _CALLBACKS
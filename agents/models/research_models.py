@@ -1,12 +1,16 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 
 class ResearchInput(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     context: str = Field(description="User's context information (may contain private data)")
     objective: str = Field(description="What the user wants to accomplish or search for")
 
 class SearchResult(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     title: str
     url: str
     content: str
@@ -15,8 +19,13 @@ class SearchResult(BaseModel):
     source_domain: str
 
 class ResearchOutput(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     original_objective: str
     anonymized_queries: List[str]
     selected_documents: List[SearchResult]
     total_documents_found: int
-    research_timestamp: datetime 
\ No newline at end of file
+    research_timestamp: datetime
+
+# Validates a whole list of raw results in one pydantic-core call
+SEARCH_RESULTS_ADAPTER = TypeAdapter(List[SearchResult])
@@ -1,8 +1,17 @@
 """
 System prompts for the ResearchAgent
+
+Each task prompt is split into a static PREFIX (instructions only) and a
+SUFFIX_TEMPLATE carrying the per-request payload, so providers can reuse
+their prefix cache across calls.
 """
 
-ANONYMIZATION_PROMPT = """
+def canonicalize_prompt(text: str) -> str:
+    """Normalizes newlines and trailing whitespace so a prompt is byte-stable across calls."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+ANONYMIZATION_PREFIX = canonicalize_prompt("""
 You are an expert at anonymizing sensitive information. Remove or replace any private data including:
 - Email addresses (replace with [EMAIL])
 - API keys (replace with [API_KEY])
@@ -15,13 +24,13 @@ You are an expert at anonymizing sensitive information. Remove or replace any pr
 - File paths that might contain usernames (replace with [PATH])
 
 Preserve the meaning and context while protecting privacy. Return only the anonymized text.
+""")
 
-Text to anonymize:
-{context}
-"""
+ANONYMIZATION_SUFFIX_TEMPLATE = """Text to anonymize:
+{context}"""
 
-QUERY_GENERATION_PROMPT = """
-Based on the following anonymized context and objective, generate {num_queries} diverse search queries that would help accomplish the objective. 
+QUERY_GENERATION_PREFIX = canonicalize_prompt("""
+Based on the anonymized context and objective provided, generate the requested number of diverse search queries that would help accomplish the objective.
 
 Make the queries:
 1. Specific and actionable
@@ -29,14 +38,16 @@ Make the queries:
 3. Likely to return relevant, high-quality results
 4. Professional and appropriate for web search
 
-Context: {anonymized_context}
-Objective: {objective}
-
 Return only the queries, one per line, without numbering or bullets.
-"""
+""")
+
+QUERY_GENERATION_FOCUS_SUFFIX_TEMPLATE = """Number of queries: 1
+This is query {query_index} of {num_queries}; cover an aspect of the objective the other queries would not.
+Context: {anonymized_context}
+Objective: {objective}"""
 
-DOCUMENT_ANALYSIS_PROMPT = """
-Analyze the following search results for the objective: {objective}
+DOCUMENT_ANALYSIS_PREFIX = canonicalize_prompt("""
+Analyze the search results provided for the given objective.
 
 For each document, provide a JSON response with:
 1. "relevance_score": A score from 0.0 to 1.0 indicating how relevant this document is to the objective
@@ -45,17 +56,28 @@ For each document, provide a JSON response with:
 
 Only include documents with relevance_score > 0.5 in your analysis.
 
+Format your response as a JSON array of objects, one for each document worth keeping.
+""")
+
+DOCUMENT_ANALYSIS_SUFFIX_TEMPLATE = """Objective: {objective}
+
 Search Results:
-{search_results}
+{search_results}"""
 
-Format your response as a JSON array of objects, one for each document worth keeping.
-"""
+QUERY_GENERATION_SUFFIX_TEMPLATE = """Number of queries: {num_queries}
+Context: {anonymized_context}
+Objective: {objective}"""
+
+# Complete single-string prompts, composed from the parts above for existing importers
+ANONYMIZATION_PROMPT = f"{ANONYMIZATION_PREFIX}\n\n{ANONYMIZATION_SUFFIX_TEMPLATE}"
+QUERY_GENERATION_PROMPT = f"{QUERY_GENERATION_PREFIX}\n\n{QUERY_GENERATION_SUFFIX_TEMPLATE}"
+DOCUMENT_ANALYSIS_PROMPT = f"{DOCUMENT_ANALYSIS_PREFIX}\n\n{DOCUMENT_ANALYSIS_SUFFIX_TEMPLATE}"
 
-WEB_SEARCH_SYSTEM_PROMPT = """
+WEB_SEARCH_SYSTEM_PROMPT = canonicalize_prompt("""
 You are a helpful research assistant with access to web search capabilities. Your goal is to:
 1. Generate effective search queries based on user context and objectives
 2. Analyze search results for relevance and quality
 3. Provide structured, useful responses while protecting user privacy
 
 Always maintain user privacy by anonymizing sensitive information before performing searches.
-""" 
\ No newline at end of file
+""")
@@ -1,25 +1,131 @@
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_tavily import TavilySearch
-from langgraph.graph import StateGraph, END, START
 from typing_extensions import TypedDict
+import logging
 import os
 import re
 import json
 import asyncio
-from typing import List, Dict, Any, Optional
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urlparse
+import orjson
+from cachetools import LRUCache, TTLCache
 
-from .models.research_models import ResearchInput, SearchResult, ResearchOutput
+from ._dedup import dedupe_documents
+from ._semantic_cache import SemanticCache
+from .models.research_models import ResearchInput, SearchResult, ResearchOutput, SEARCH_RESULTS_ADAPTER
 from .prompts.research_prompts import (
-    ANONYMIZATION_PROMPT,
-    QUERY_GENERATION_PROMPT, 
-    DOCUMENT_ANALYSIS_PROMPT,
+    ANONYMIZATION_PREFIX,
+    ANONYMIZATION_SUFFIX_TEMPLATE,
+    QUERY_GENERATION_PREFIX,
+    QUERY_GENERATION_FOCUS_SUFFIX_TEMPLATE,
+    DOCUMENT_ANALYSIS_PREFIX,
+    DOCUMENT_ANALYSIS_SUFFIX_TEMPLATE,
     WEB_SEARCH_SYSTEM_PROMPT
 )
 from .langfuse_config import get_langfuse_callbacks
 
+# The Gemini, Tavily and LangGraph packages are imported where they are first
+# used, so importing this module (or the models next to it) stays cheap
+if TYPE_CHECKING:
+    from langchain_tavily import TavilySearch
+
+logger = logging.getLogger(__name__)
+
+# Patterns for the regex anonymization fallback, compiled once.
+# Unbounded runs use possessive quantifiers so a failed match never backtracks through them.
+# They stay separate passes on purpose: a fused alternation loses the literal-prefix
+# search each pattern gets on its own and is slower on typical text, and an earlier
+# replacement can create the word boundary a later pattern needs.
+_LONG_TOKEN_RE = re.compile(r'\b[A-Za-z0-9]{32,}+\b')
+_OPENAI_KEY_RE = re.compile(r'sk-[A-Za-z0-9]{48}')
+_IP_ADDRESS_RE = re.compile(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+_URL_RE = re.compile(r'https?://\S++')
+# Authority part of an http(s) URL, the same text urlparse reports as netloc
+_DOMAIN_RE = re.compile(r'^https?://([^/?#]+)', re.IGNORECASE)
+
+# Pieces of the email pattern \b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b
+_EMAIL_LOCAL_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-")
+_EMAIL_DOMAIN_RE = re.compile(r'[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_WORD_BOUNDARY_RE = re.compile(r'\b')
+
+def _replace_emails(text: str, replacement: str = '[EMAIL]') -> str:
+    """
+    Replace email addresses, matching exactly what the email pattern above would.
+
+    The regex retries its local part from every word boundary of a long run of
+    local-part characters, which is quadratic when no valid address follows.
+    Anchoring on each "@" instead scans every local-part run once.
+    """
+    if '@' not in text:
+        return text
+    
+    parts = []
+    last = 0  # End of the previous replacement
+    at = text.find('@')
+    while at != -1:
+        # Walk back over the local part, never into the previous match
+        start = at
+        while start > last and text[start - 1] in _EMAIL_LOCAL_CHARS:
+            start -= 1
+        
+        # The address begins at the first word boundary of that run
+        boundary = _WORD_BOUNDARY_RE.search(text, start, at)
+        if boundary is not None and boundary.start() < at:
+            domain = _EMAIL_DOMAIN_RE.match(text, at + 1)
+            if domain is not None:
+                parts.append(text[last:boundary.start()])
+                parts.append(replacement)
+                last = domain.end()
+                at = text.find('@', last)
+                continue
+        at = text.find('@', at + 1)
+    
+    parts.append(text[last:])
+    return "".join(parts)
+
+# Tavily results shared by all agents, keyed by (max_results, topic, normalized query)
+_SEARCH_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+# Searches currently running, so concurrent identical queries share one call
+_SEARCH_INFLIGHT: Dict[Tuple[Any, ...], "asyncio.Task"] = {}
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _decode_json_array_items(buffer: str, pos: int) -> Tuple[List[Any], int, bool]:
+    """
+    Decode the complete elements of a partially received JSON array.
+
+    Args:
+        buffer (str): The text received so far.
+        pos (int): Position just past the opening "[" or the last decoded element.
+
+    Returns:
+        Tuple[List[Any], int, bool]: The newly decoded elements, the position to resume
+            from once more text arrives, and whether the closing "]" was reached.
+    """
+    items: List[Any] = []
+    end = len(buffer)
+    while True:
+        while pos < end and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= end:
+            return items, pos, False
+        if buffer[pos] == "]":
+            return items, pos + 1, True
+        try:
+            item, pos_after = _JSON_DECODER.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The element is still incomplete
+            return items, pos, False
+        if pos_after >= end and not isinstance(item, (dict, list, str)):
+            # A number or literal at the very end may still be growing
+            return items, pos, False
+        items.append(item)
+        pos = pos_after
+
 class ResearchState(TypedDict):
     """State object for LangGraph workflow"""
     research_input: Optional[ResearchInput]
@@ -33,7 +139,9 @@ class ResearchState(TypedDict):
 class ResearchAgent:
     def __init__(self, model_name: str = "gemini-2.0-flash", temperature: float = 0.7, 
                  top_p: float = 1.0, num_queries: int = 2, tavily_max_results: int = 5,
-                 tavily_topic: str = "general", relevance_threshold: float = 0.5):
+                 tavily_topic: str = "general", relevance_threshold: float = 0.5,
+                 analysis_batch_size: int = 10, semantic_cache: Optional[SemanticCache] = None,
+                 regex_only_max_chars: int = 0, anonymize_cache_size: int = 1024):
         """
         Initializes the Research Agent with configurable parameters.
 
@@ -45,46 +153,95 @@ class ResearchAgent:
             tavily_max_results (int): Maximum number of search results per query.
             tavily_topic (str): The topic for Tavily search ("general" or "news").
             relevance_threshold (float): Minimum relevance score to include documents.
+            analysis_batch_size (int): Number of documents analyzed per LLM call.
+            semantic_cache (Optional[SemanticCache]): Cache of previous research results
+                keyed on objective and anonymized context. Share one instance between
+                agents to reuse results across requests. Disabled when None.
+            regex_only_max_chars (int): Contexts shorter than this in which the regex pass
+                finds nothing skip the LLM anonymization call. The regex pass only catches
+                emails, phone numbers, URLs, API keys and IP addresses, so names, companies
+                and addresses in such contexts reach the search queries verbatim. 0 (the
+                default) always calls the LLM; raise it only where that trade-off is acceptable.
+            anonymize_cache_size (int): Number of LLM-anonymized contexts remembered, so a
+                repeated context is not sent to the LLM again. 0 disables the cache.
         """
         self.num_queries = num_queries
         self.relevance_threshold = relevance_threshold
+        self.analysis_batch_size = max(1, analysis_batch_size)
+        self.semantic_cache = semantic_cache
+        self.regex_only_max_chars = regex_only_max_chars
+        # Keyed by a BLAKE2b digest of the context, so the cache holds no raw private text
+        self._anonymize_cache: Optional[LRUCache] = (
+            LRUCache(maxsize=anonymize_cache_size) if anonymize_cache_size > 0 else None
+        )
         
         # Initialize the LLM
+        from langchain_google_genai import ChatGoogleGenerativeAI
         self.llm = ChatGoogleGenerativeAI(
             model=model_name,
             temperature=temperature,
             top_p=top_p,
             google_api_key=os.getenv("GEMINI_API_KEY")
         )
+
+        # Resolve Langfuse callbacks once; the invoke config is reused for every call
+        try:
+            callbacks = get_langfuse_callbacks()
+        except Exception as e:
+            logger.warning("Failed to get Langfuse callbacks: %s", e)
+            callbacks = []
+        self._invoke_config: Optional[Dict[str, Any]] = {"callbacks": callbacks} if callbacks else None
         
-        # Initialize Tavily Search Tool
-        self.tavily_search_tool = TavilySearch(
-            max_results=tavily_max_results,
-            topic=tavily_topic,
-            api_key=os.getenv("TAVILY_API_KEY")
-        )
-        
-        # Build the workflow graph
-        self.workflow = self._build_workflow()
+        # The Tavily tool and the workflow graph are built on first use,
+        # so helpers that only call the LLM pay no tool or graph setup cost
+        self.tavily_max_results = tavily_max_results
+        self.tavily_topic = tavily_topic
+        self._tavily: Optional["TavilySearch"] = None
+        self._workflow = None
+
+    @property
+    def tavily_search_tool(self) -> "TavilySearch":
+        """The Tavily search tool, created on first access."""
+        if self._tavily is None:
+            from langchain_tavily import TavilySearch
+            self._tavily = TavilySearch(
+                max_results=self.tavily_max_results,
+                topic=self.tavily_topic,
+                api_key=os.getenv("TAVILY_API_KEY")
+            )
+        return self._tavily
+
+    @property
+    def workflow(self):
+        """The compiled research workflow graph, built on first access."""
+        if self._workflow is None:
+            self._workflow = self._build_workflow()
+        return self._workflow
 
     def _build_workflow(self):
         """Build the LangGraph workflow for the research process."""
+        from langgraph.graph import StateGraph, END, START
+
         
-        def anonymize_node(state: ResearchState) -> ResearchState:
+        async def anonymize_node(state: ResearchState) -> ResearchState:
             """Node to anonymize the user context."""
             try:
                 if not state.get("research_input"):
                     state["error"] = "No research input provided"
                     return state
                 
-                anonymized_context = self.anonymize_context(state["research_input"].context)
+                # Already anonymized by research() for the semantic cache lookup
+                if state.get("anonymized_context"):
+                    return state
+                
+                anonymized_context = await self.anonymize_context(state["research_input"].context)
                 state["anonymized_context"] = anonymized_context
                 return state
             except Exception as e:
                 state["error"] = f"Error in anonymization: {str(e)}"
                 return state
 
-        def query_generation_node(state: ResearchState) -> ResearchState:
+        async def query_generation_node(state: ResearchState) -> ResearchState:
             """Node to generate search queries."""
             try:
                 if state.get("error"):
@@ -94,7 +251,7 @@ class ResearchAgent:
                     state["error"] = "No research input provided"
                     return state
                 
-                queries = self.generate_search_queries(
+                queries = await self.generate_search_queries(
                     state["anonymized_context"],
                     state["research_input"].objective,
                     self.num_queries
@@ -105,31 +262,42 @@ class ResearchAgent:
                 state["error"] = f"Error in query generation: {str(e)}"
                 return state
 
-        def search_node(state: ResearchState) -> ResearchState:
+        async def search_node(state: ResearchState) -> ResearchState:
             """Node to execute web searches."""
             try:
                 if state.get("error"):
                     return state
                 
+                # Run every query concurrently; a failed query does not sink the others
+                queries = state["search_queries"]
+                results_list = await asyncio.gather(
+                    *(self._cached_search(query) for query in queries),
+                    return_exceptions=True
+                )
+                
                 all_results = []
-                for query in state["search_queries"]:
-                    try:
-                        results = self.tavily_search_tool.invoke({"query": query})
-                        if isinstance(results, list):
-                            all_results.extend(results)
-                        elif isinstance(results, dict) and "results" in results:
-                            all_results.extend(results["results"])
-                    except Exception as e:
-                        print(f"Error searching for query '{query}': {e}")
+                for query, results in zip(queries, results_list):
+                    if isinstance(results, BaseException):
+                        logger.error("Error searching for query %r", query, exc_info=results)
                         continue
+                    if isinstance(results, list):
+                        all_results.extend(results)
+                    elif isinstance(results, dict) and "results" in results:
+                        all_results.extend(results["results"])
                 
-                state["raw_search_results"] = all_results
+                # Overlapping queries return the same pages; only analyze each once
+                deduped = dedupe_documents(all_results)
+                
+                # Resolve every domain in one pass so result construction only reads it
+                for doc in deduped:
+                    doc["_domain"] = self._extract_domain(doc.get("url", ""))
+                state["raw_search_results"] = deduped
                 return state
             except Exception as e:
                 state["error"] = f"Error in web search: {str(e)}"
                 return state
 
-        def analysis_node(state: ResearchState) -> ResearchState:
+        async def analysis_node(state: ResearchState) -> ResearchState:
             """Node to analyze and filter search results."""
             try:
                 if state.get("error"):
@@ -139,7 +307,7 @@ class ResearchAgent:
                     state["error"] = "No research input provided"
                     return state
                 
-                analyzed_docs = self.analyze_and_filter_documents(
+                analyzed_docs = await self.analyze_and_filter_documents(
                     state["raw_search_results"],
                     state["research_input"].objective
                 )
@@ -149,7 +317,7 @@ class ResearchAgent:
                 state["error"] = f"Error in document analysis: {str(e)}"
                 return state
 
-        def output_node(state: ResearchState) -> ResearchState:
+        async def output_node(state: ResearchState) -> ResearchState:
             """Node to format the final output."""
             try:
                 if state.get("error"):
@@ -192,9 +360,61 @@ class ResearchAgent:
         
         return workflow.compile()
 
-    def anonymize_context(self, context: str) -> str:
+    async def _cached_search(self, query: str) -> Any:
         """
-        Remove or anonymize private information from context.
+        Run a Tavily search, reusing results for the same query from the last hour.
+
+        Concurrent calls for a query that is already being fetched await that call
+        instead of issuing their own.
+        
+        Args:
+            query (str): The search query.
+            
+        Returns:
+            Any: The raw Tavily response.
+        """
+        key = (self.tavily_max_results, self.tavily_topic, " ".join(query.lower().split()))
+        cached = _SEARCH_CACHE.get(key)
+        if cached is not None:
+            return cached
+        
+        task = _SEARCH_INFLIGHT.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.tavily_search_tool.ainvoke({"query": query}))
+            _SEARCH_INFLIGHT[key] = task
+            task.add_done_callback(lambda _: _SEARCH_INFLIGHT.pop(key, None))
+        
+        # Shielded so one cancelled caller does not cancel the search for the others
+        results = await asyncio.shield(task)
+        if isinstance(results, list) or (isinstance(results, dict) and "results" in results):
+            _SEARCH_CACHE[key] = results
+        return results
+
+    def _build_prompt_messages(self, static_parts: List[str], user_content: str) -> List[BaseMessage]:
+        """
+        Build a [system, user] message pair with a byte-stable, cacheable prefix.
+
+        The static instructions go first in a single system message and the
+        per-request payload follows in a trailing user message. For Anthropic models
+        the system message is sent as content blocks whose last one carries a
+        cache_control marker; other providers get it as plain text.
+        
+        Args:
+            static_parts (List[str]): Static prompt sections, in order.
+            user_content (str): The formatted per-request payload.
+            
+        Returns:
+            List[BaseMessage]: The messages to send to the LLM.
+        """
+        if getattr(self.llm, "_llm_type", None) != "anthropic-chat":
+            return [SystemMessage(content="\n\n".join(static_parts)), HumanMessage(content=user_content)]
+        blocks: List[Dict[str, Any]] = [{"type": "text", "text": part} for part in static_parts]
+        blocks[-1]["cache_control"] = {"type": "ephemeral"}
+        return [SystemMessage(content=blocks), HumanMessage(content=user_content)]
+
+    async def anonymize_context(self, context: str) -> str:
+        """
+        Asynchronously remove or anonymize private information from context.
         
         Args:
             context (str): The original context containing potential private information.
@@ -202,45 +422,65 @@ class ResearchAgent:
         Returns:
             str: Anonymized context with sensitive information replaced.
         """
+        cache_key = None
+        if self._anonymize_cache is not None:
+            cache_key = hashlib.blake2b(context.encode(), digest_size=16).digest()
+            cached = self._anonymize_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Cheap regex pass first; when opted in, short contexts it finds nothing in
+        # skip the LLM round-trip
+        cleaned = self._regex_anonymize(context)
+        if cleaned == context and len(context) < self.regex_only_max_chars:
+            return cleaned
+        
         try:
-            # Use LLM for intelligent anonymization
-            prompt = ANONYMIZATION_PROMPT.format(context=context)
-            callbacks = get_langfuse_callbacks()
-            config = {"callbacks": callbacks} if callbacks else {}
-            response = self.llm.invoke([HumanMessage(content=prompt)], config=config)
+            # Use LLM for intelligent anonymization, on text already stripped of regex matches
+            messages = self._build_prompt_messages(
+                [ANONYMIZATION_PREFIX],
+                ANONYMIZATION_SUFFIX_TEMPLATE.format(context=cleaned)
+            )
+            response = await self.llm.ainvoke(messages, config=self._invoke_config)
             anonymized = response.content.strip()
             
             # Fallback regex-based anonymization for extra safety
             anonymized = self._regex_anonymize(anonymized)
             
+            # Only LLM results are worth remembering; regex fallbacks are not pinned
+            if cache_key is not None:
+                self._anonymize_cache[cache_key] = anonymized
             return anonymized
-        except Exception as e:
-            print(f"Error in LLM anonymization, using regex fallback: {e}")
-            return self._regex_anonymize(context)
+        except Exception:
+            logger.exception("Error in LLM anonymization, using regex fallback")
+            return cleaned
 
     def _regex_anonymize(self, text: str) -> str:
         """Fallback regex-based anonymization."""
         # Email addresses
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
+        text = _replace_emails(text)
         
         # API keys (common patterns)
-        text = re.sub(r'\b[A-Za-z0-9]{32,}\b', '[API_KEY]', text)
-        text = re.sub(r'sk-[A-Za-z0-9]{48}', '[API_KEY]', text)
+        text = _LONG_TOKEN_RE.sub('[API_KEY]', text)
+        text = _OPENAI_KEY_RE.sub('[API_KEY]', text)
         
         # IP addresses
-        text = re.sub(r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b', '[IP_ADDRESS]', text)
+        text = _IP_ADDRESS_RE.sub('[IP_ADDRESS]', text)
         
         # Phone numbers (US format)
-        text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
+        text = _PHONE_RE.sub('[PHONE]', text)
         
         # URLs with sensitive info
-        text = re.sub(r'https?://[^\s]+', '[URL]', text)
+        text = _URL_RE.sub('[URL]', text)
         
         return text
 
-    def generate_search_queries(self, anonymized_context: str, objective: str, num_queries: int) -> List[str]:
+    async def generate_search_queries(self, anonymized_context: str, objective: str, num_queries: int) -> List[str]:
         """
-        Generate N search queries based on anonymized context and objective.
+        Asynchronously generate N search queries based on anonymized context and objective.
+
+        Each query comes from its own LLM call, all issued concurrently, so the
+        stage costs one round-trip regardless of N.
         
         Args:
             anonymized_context (str): The anonymized context.
@@ -251,37 +491,51 @@ class ResearchAgent:
             List[str]: List of search queries.
         """
         try:
-            prompt = QUERY_GENERATION_PROMPT.format(
-                anonymized_context=anonymized_context,
-                objective=objective,
-                num_queries=num_queries
+            prompts = [
+                self._build_prompt_messages(
+                    [WEB_SEARCH_SYSTEM_PROMPT, QUERY_GENERATION_PREFIX],
+                    QUERY_GENERATION_FOCUS_SUFFIX_TEMPLATE.format(
+                        query_index=i + 1,
+                        num_queries=num_queries,
+                        anonymized_context=anonymized_context,
+                        objective=objective
+                    )
+                )
+                for i in range(num_queries)
+            ]
+            responses = await asyncio.gather(
+                *(self.llm.ainvoke(messages, config=self._invoke_config) for messages in prompts),
+                return_exceptions=True
             )
             
-            callbacks = get_langfuse_callbacks()
-            config = {"callbacks": callbacks} if callbacks else {}
-            response = self.llm.invoke([
-                SystemMessage(content=WEB_SEARCH_SYSTEM_PROMPT),
-                HumanMessage(content=prompt)
-            ], config=config)
-            
-            # Parse queries from response
-            queries = [q.strip() for q in response.content.strip().split('\n') if q.strip()]
+            # Take the first line of each response, dropping duplicates
+            queries: List[str] = []
+            for response in responses:
+                if isinstance(response, BaseException):
+                    logger.error("Error generating a query", exc_info=response)
+                    continue
+                lines = [q.strip() for q in response.content.strip().split('\n') if q.strip()]
+                if lines and lines[0] not in queries:
+                    queries.append(lines[0])
             
             # Ensure we have the requested number of queries
-            if len(queries) < num_queries:
+            if len(queries) < num_queries and objective not in queries:
                 # Add a fallback query if we don't have enough
                 queries.append(objective)
             
             return queries[:num_queries]
             
-        except Exception as e:
-            print(f"Error generating queries: {e}")
+        except Exception:
+            logger.exception("Error generating queries")
             # Fallback to using the objective as a single query
             return [objective]
 
-    def analyze_and_filter_documents(self, documents: List[Dict], objective: str) -> List[SearchResult]:
+    async def analyze_and_filter_documents(self, documents: List[Dict], objective: str) -> List[SearchResult]:
         """
-        Use LLM to analyze, filter, and score documents.
+        Asynchronously use the LLM to analyze, filter, and score documents.
+
+        Documents are split into batches of analysis_batch_size that are analyzed
+        concurrently; a batch whose analysis fails falls back to keyword scoring.
         
         Args:
             documents (List[Dict]): Raw search results from Tavily.
@@ -293,6 +547,26 @@ class ResearchAgent:
         if not documents:
             return []
         
+        try:
+            size = self.analysis_batch_size
+            batches = [documents[i:i + size] for i in range(0, len(documents), size)]
+            batch_results = await asyncio.gather(
+                *(self._analyze_document_batch(batch, objective) for batch in batches)
+            )
+            
+            search_results = [result for batch in batch_results for result in batch]
+            
+            # Sort by relevance score (highest first)
+            search_results.sort(key=lambda x: x.relevance_score, reverse=True)
+            
+            return search_results
+            
+        except Exception:
+            logger.exception("Error in document analysis")
+            return self._fallback_document_analysis(documents, objective)
+
+    async def _analyze_document_batch(self, documents: List[Dict], objective: str) -> List[SearchResult]:
+        """Analyze one batch of documents with a single LLM call."""
         try:
             # Format documents for analysis
             formatted_docs = []
@@ -305,97 +579,110 @@ class ResearchAgent:
                 }
                 formatted_docs.append(formatted_doc)
             
-            prompt = DOCUMENT_ANALYSIS_PROMPT.format(
-                objective=objective,
-                search_results=json.dumps(formatted_docs, indent=2)
+            messages = self._build_prompt_messages(
+                [WEB_SEARCH_SYSTEM_PROMPT, DOCUMENT_ANALYSIS_PREFIX],
+                DOCUMENT_ANALYSIS_SUFFIX_TEMPLATE.format(
+                    objective=objective,
+                    # Compact, unescaped JSON keeps the prompt short
+                    search_results=orjson.dumps(formatted_docs).decode()
+                )
             )
             
-            callbacks = get_langfuse_callbacks()
-            config = {"callbacks": callbacks} if callbacks else {}
-            response = self.llm.invoke([
-                SystemMessage(content=WEB_SEARCH_SYSTEM_PROMPT),
-                HumanMessage(content=prompt)
-            ], config=config)
-            
-            # Parse JSON response
-            try:
-                analysis_results = json.loads(response.content.strip())
-            except json.JSONDecodeError:
-                # Fallback: keep all documents with default scoring
-                return self._fallback_document_analysis(documents, objective)
-            
-            # Convert to SearchResult objects
-            search_results = []
-            for result in analysis_results:
-                if not isinstance(result, dict):
+            # Stream the answer and turn each array element into a result as soon as it is complete
+            raw_results = []
+            buffer = ""
+            pos = None  # Parse position, set once the opening "[" has arrived
+            closed = False
+            async for chunk in self.llm.astream(messages, config=self._invoke_config):
+                if closed or not isinstance(chunk.content, str):
                     continue
-                
-                doc_index = result.get("index", 0)
-                if doc_index >= len(documents):
-                    continue
-                
-                original_doc = documents[doc_index]
-                relevance_score = float(result.get("relevance_score", 0.0))
-                
-                if relevance_score >= self.relevance_threshold:
-                    search_result = SearchResult(
-                        title=original_doc.get("title", ""),
-                        url=original_doc.get("url", ""),
-                        content=original_doc.get("content", ""),
-                        relevance_score=relevance_score,
-                        summary=result.get("summary", ""),
-                        source_domain=self._extract_domain(original_doc.get("url", ""))
-                    )
-                    search_results.append(search_result)
+                buffer += chunk.content
+                if pos is None:
+                    start = buffer.find("[")
+                    if start == -1:
+                        continue
+                    pos = start + 1
+                items, pos, closed = _decode_json_array_items(buffer, pos)
+                for result in items:
+                    raw_result = self._analysis_item_to_result(result, documents)
+                    if raw_result is not None:
+                        raw_results.append(raw_result)
             
-            # Sort by relevance score (highest first)
-            search_results.sort(key=lambda x: x.relevance_score, reverse=True)
+            if not closed:
+                # Fallback: the response was not a complete JSON array
+                return self._fallback_document_analysis(documents, objective)
             
-            return search_results
+            return SEARCH_RESULTS_ADAPTER.validate_python(raw_results)
             
-        except Exception as e:
-            print(f"Error in document analysis: {e}")
+        except Exception:
+            logger.exception("Error in document analysis")
             return self._fallback_document_analysis(documents, objective)
 
+    def _analysis_item_to_result(self, result: Any, documents: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Map one LLM analysis item back to its document, or None if it is invalid or below the threshold."""
+        if not isinstance(result, dict):
+            return None
+        
+        doc_index = result.get("index", 0)
+        if doc_index >= len(documents):
+            return None
+        
+        original_doc = documents[doc_index]
+        relevance_score = float(result.get("relevance_score", 0.0))
+        
+        if relevance_score < self.relevance_threshold:
+            return None
+        return {
+            "title": original_doc.get("title", ""),
+            "url": original_doc.get("url", ""),
+            "content": original_doc.get("content", ""),
+            "relevance_score": relevance_score,
+            "summary": result.get("summary", ""),
+            "source_domain": original_doc.get("_domain") or self._extract_domain(original_doc.get("url", ""))
+        }
+
     def _fallback_document_analysis(self, documents: List[Dict], objective: str) -> List[SearchResult]:
         """Fallback document analysis when LLM analysis fails."""
         search_results = []
+        # Split the objective once rather than per document
+        objective_words = objective.lower().split()
         for doc in documents:
             # Simple relevance scoring based on keyword matching
             title = doc.get("title", "").lower()
             content = doc.get("content", "").lower()
-            objective_words = objective.lower().split()
             
-            score = 0.0
-            for word in objective_words:
-                if word in title:
-                    score += 0.3
-                if word in content:
-                    score += 0.1
-            
-            score = min(score, 1.0)  # Cap at 1.0
+            # Count matches with C-level substring scans instead of accumulating floats
+            title_hits = sum(word in title for word in objective_words)
+            content_hits = sum(word in content for word in objective_words)
+            score = min(0.3 * title_hits + 0.1 * content_hits, 1.0)  # Cap at 1.0
             
             if score >= self.relevance_threshold:
-                search_result = SearchResult(
+                # The score is in [0, 1] by construction and every field is a str,
+                # so the validation pass is skipped for these locally built results
+                search_results.append(SearchResult.model_construct(
                     title=doc.get("title", ""),
                     url=doc.get("url", ""),
                     content=doc.get("content", ""),
                     relevance_score=score,
                     summary=content[:200] + "..." if len(content) > 200 else content,
-                    source_domain=self._extract_domain(doc.get("url", ""))
-                )
-                search_results.append(search_result)
+                    source_domain=doc.get("_domain") or self._extract_domain(doc.get("url", ""))
+                ))
         
         # Sort by relevance score
         search_results.sort(key=lambda x: x.relevance_score, reverse=True)
         return search_results
 
-    def _extract_domain(self, url: str) -> str:
-        """Extract domain from URL."""
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_domain(url: str) -> str:
+        """Extract domain from URL, or "unknown" when it has none."""
+        match = _DOMAIN_RE.match(url)
+        if match:
+            return match.group(1)
+        # Other schemes are rare enough to leave to the general parser
         try:
-            parsed = urlparse(url)
-            return parsed.netloc
-        except:
+            return urlparse(url).netloc or "unknown"
+        except ValueError:
             return "unknown"
 
     async def research(self, research_input: ResearchInput) -> ResearchOutput:
@@ -420,8 +707,22 @@ class ResearchAgent:
                 "error": None
             }
             
+            # Look up near-duplicate research; the key only carries anonymized context
+            cache_vector = None
+            if self.semantic_cache is not None:
+                anonymized_context = await self.anonymize_context(research_input.context)
+                initial_state["anonymized_context"] = anonymized_context
+                cache_vector, cached = await self.semantic_cache.alookup(
+                    f"{research_input.objective}\n{anonymized_context}"
+                )
+                if cached is not None:
+                    return cached.model_copy(update={"original_objective": research_input.objective})
+            
             # Execute the workflow
-            final_state = self.workflow.invoke(initial_state)
+            final_state = await self.workflow.ainvoke(initial_state)
+            
+            if cache_vector is not None and not final_state.get("error") and final_state.get("final_output"):
+                self.semantic_cache.add(cache_vector, final_state["final_output"])  # type: ignore
             
             if final_state.get("error"):
                 # Return error as empty result
@@ -441,8 +742,8 @@ class ResearchAgent:
                 research_timestamp=datetime.now()
             )
             
-        except Exception as e:
-            print(f"Error in research process: {e}")
+        except Exception:
+            logger.exception("Error in research process")
             # Return empty result on error
             return ResearchOutput(
                 original_objective=research_input.objective,
@@ -1,21 +1,36 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 # from fastapi.responses import JSONResponse
 import os
 from dotenv import load_dotenv
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Type, TypeVar, Union
 from agents.gemini_agent_basic import GeminiAgentBasic
 from agents.model_basic import ModelBasic
-from utils.logging_utils import log_model_response, log_request_details
+from utils.logging_utils import log_model_response, log_request_details, setup_queue_logging, stop_queue_logging, start_log_writer, stop_log_writer
 
 # Load environment variables
 load_dotenv(dotenv_path=".env.local", override=True)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Log records and request/response reports are written by background
+    # threads, off the request path
+    setup_queue_logging()
+    start_log_writer()
+    yield
+    stop_log_writer()
+    stop_queue_logging()
+
 app = FastAPI(
     title="Personal Chat AI Backend",
     description="FastAPI backend for Personal Chat application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -33,41 +48,112 @@ class InvokeRequest(BaseModel):
     top_p: Optional[float] = 1.0
     model_name: Optional[str] = "gemini-2.0-flash"
     model_provider: Optional[str] = "google"
+    stream: bool = False
+
+
+async def _parse_invoke_request(http_request: Request) -> InvokeRequest:
+    """
+    Validates the raw JSON body straight into InvokeRequest.
+
+    pydantic-core parses the bytes itself, skipping the intermediate Python dict
+    FastAPI would otherwise build with json.loads and then walk again to validate.
+    """
+    try:
+        return InvokeRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        # Same error locations FastAPI reports for body fields
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+
+# The body is read by _parse_invoke_request, so document its schema explicitly
+_INVOKE_REQUEST_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": InvokeRequest.model_json_schema()}},
+    }
+}
+
+AgentT = TypeVar("AgentT")
+
+def _stream_response(agent: Union[ModelBasic, GeminiAgentBasic], messages: List[Dict[str, Any]]) -> StreamingResponse:
+    """Streams the completion text as it is generated, logging the full response once it finishes."""
+    async def token_gen() -> AsyncIterator[str]:
+        parts: List[str] = []
+        async for text in agent.astream_completion(messages):
+            parts.append(text)
+            yield text
+        log_model_response("".join(parts), None)
 
+    return StreamingResponse(token_gen(), media_type="text/plain")
 
-@app.post("/invoke_basic_model")
-async def invoke_basic_model(request: InvokeRequest) -> Dict[str, str]:
+# Agents shared across requests, keyed by class and constructor arguments
+_AGENTS: Dict[Tuple[Any, ...], Any] = {}
+_AGENTS_MAX = 32
+_agents_lock = asyncio.Lock()
+
+async def _get_or_create_agent(cls: Type[AgentT], **kwargs: Any) -> AgentT:
+    """
+    Returns the shared agent for these arguments, creating it on first use.
+
+    Reusing agents keeps their LLM clients and connection pools warm. The lock makes
+    sure concurrent first requests build a single instance; the oldest agent is
+    dropped once more than _AGENTS_MAX parameter sets are in use.
+    """
+    key = (cls, *sorted(kwargs.items()))
+    agent = _AGENTS.get(key)
+    if agent is not None:
+        return agent
+
+    async with _agents_lock:
+        agent = _AGENTS.get(key)
+        if agent is None:
+            agent = cls(**kwargs)
+            if len(_AGENTS) >= _AGENTS_MAX:
+                del _AGENTS[next(iter(_AGENTS))]
+            _AGENTS[key] = agent
+    return agent
+
+
+@app.post("/invoke_basic_model", response_model=None, openapi_extra=_INVOKE_REQUEST_OPENAPI)
+async def invoke_basic_model(request: InvokeRequest = Depends(_parse_invoke_request)) -> Union[Dict[str, str], StreamingResponse]:
     # Log request details
     log_request_details(request)
     
-    model_agent = ModelBasic(
+    model_agent = await _get_or_create_agent(
+        ModelBasic,
+        model_provider=request.model_provider,
         model_name=request.model_name,
         temperature=request.temperature,
-        top_p=request.top_p,
-        model_provider=request.model_provider
+        top_p=request.top_p
     )
+
+    if request.stream:
+        return _stream_response(model_agent, request.messages)
     
     # Use the new method that returns both content and metadata
-    response_content, response_metadata = model_agent.invoke_completion_with_metadata(request.messages)
+    response_content, response_metadata = await model_agent.ainvoke_completion_with_metadata(request.messages)
 
     # Log response details with metadata
     log_model_response(response_content, response_metadata)
 
     return {"response": response_content}
 
-@app.post("/invoke_agent")
-async def invoke_agent(request: InvokeRequest) -> Dict[str, str]:
+@app.post("/invoke_agent", response_model=None, openapi_extra=_INVOKE_REQUEST_OPENAPI)
+async def invoke_agent(request: InvokeRequest = Depends(_parse_invoke_request)) -> Union[Dict[str, str], StreamingResponse]:
     # Log request details
     log_request_details(request)
     
-    gemini_agent = GeminiAgentBasic(
+    gemini_agent = await _get_or_create_agent(
+        GeminiAgentBasic,
         model_name=request.model_name,
         temperature=request.temperature,
         top_p=request.top_p
     )
+
+    if request.stream:
+        return _stream_response(gemini_agent, request.messages)
     
     # Use the new method that returns both content and metadata
-    response_content, response_metadata = gemini_agent.invoke_completion_with_metadata(request.messages)
+    response_content, response_metadata = await gemini_agent.ainvoke_completion_with_metadata(request.messages)
     
     # Log response details with metadata
     log_model_response(response_content, response_metadata)
@@ -3,7 +3,48 @@
 Test script to demonstrate the logging functions and reasoning token detection.
 """
 
-from utils.logging_utils import log_model_response, log_request_details, log_reasoning_tokens_info, InvokeRequest
+import pytest
+from utils.logging_utils import log_model_response, log_request_details, log_reasoning_tokens_info, InvokeRequest, Message, ResponseMetadata, UsageMetadata
+
+def _metadata_new(reasoning):
+    """Sample metadata reporting reasoning tokens in the LangChain standard format."""
+    return {
+        'prompt_feedback': {'block_reason': 0, 'safety_ratings': []},
+        'finish_reason': 'STOP',
+        'model_name': 'gemini-2.0-flash-thinking',
+        'safety_ratings': [],
+        'usage_metadata': {
+            'input_tokens': 25,
+            'output_tokens': 35,
+            'total_tokens': 185,
+            'output_token_details': {
+                'reasoning': reasoning  # This indicates reasoning was used (LangChain standard)
+            }
+        }
+    }
+
+def _metadata_legacy(reasoning):
+    """Sample metadata reporting reasoning tokens in the legacy thoughts_token_count format."""
+    return {
+        'prompt_feedback': {'block_reason': 0, 'safety_ratings': []},
+        'finish_reason': 'STOP',
+        'model_name': 'gemini-2.0-flash-thinking',
+        'safety_ratings': [],
+        'usage_metadata': {
+            'input_tokens': 25,
+            'output_tokens': 35,
+            'total_tokens': 185,
+            'thoughts_token_count': reasoning  # Legacy format
+        }
+    }
+
+def _metadata_typed(reasoning):
+    """Sample metadata built directly as the logger's slotted dataclasses."""
+    return ResponseMetadata(
+        usage_metadata=UsageMetadata(input_tokens=25, output_tokens=35, total_tokens=185, reasoning=reasoning),
+        finish_reason='STOP',
+        model_name='gemini-2.0-flash-thinking'
+    )
 
 def test_logging_functions():
     """Test the logging functions with mock data."""
@@ -13,11 +54,11 @@ def test_logging_functions():
     
     # Test request logging
     sample_request = InvokeRequest(
-        messages=[
-            {"role": "user", "content": "What is the meaning of life?"},
-            {"role": "assistant", "content": "42"},
-            {"role": "user", "content": "Please explain that answer."}
-        ],
+        messages=(
+            Message("user", "What is the meaning of life?"),
+            Message("assistant", "42"),
+            Message("user", "Please explain that answer.")
+        ),
         temperature=0.7,
         top_p=0.9,
         model_name="gemini-2.0-flash",
@@ -46,46 +87,9 @@ def test_logging_functions():
     
     log_model_response(sample_response_no_reasoning, sample_metadata_no_reasoning)
     
-    # Test response logging with reasoning tokens (LangChain standard format)
-    print("🧠 Testing response WITH reasoning tokens (LangChain standard format):")
-    sample_response_with_reasoning = "After thinking about this question deeply, I believe the meaning of life involves finding purpose, creating connections, and contributing positively to the world around us."
-    sample_metadata_with_reasoning = {
-        'prompt_feedback': {'block_reason': 0, 'safety_ratings': []},
-        'finish_reason': 'STOP',
-        'model_name': 'gemini-2.0-flash-thinking',
-        'safety_ratings': [],
-        'usage_metadata': {
-            'input_tokens': 25,
-            'output_tokens': 35,
-            'total_tokens': 185,
-            'output_token_details': {
-                'reasoning': 125  # This indicates reasoning was used (LangChain standard)
-            }
-        }
-    }
-    
-    log_model_response(sample_response_with_reasoning, sample_metadata_with_reasoning)
-    
     # Test reasoning token analysis
     print("🔍 Testing detailed reasoning token analysis:")
-    log_reasoning_tokens_info(sample_metadata_with_reasoning['usage_metadata'])
-    
-    # Test legacy format for backward compatibility
-    print("🔄 Testing legacy format (thoughts_token_count) for backward compatibility:")
-    sample_metadata_legacy = {
-        'prompt_feedback': {'block_reason': 0, 'safety_ratings': []},
-        'finish_reason': 'STOP',
-        'model_name': 'gemini-2.0-flash-thinking',
-        'safety_ratings': [],
-        'usage_metadata': {
-            'input_tokens': 25,
-            'output_tokens': 35,
-            'total_tokens': 185,
-            'thoughts_token_count': 125  # Legacy format
-        }
-    }
-    
-    log_model_response("Legacy format test response.", sample_metadata_legacy)
+    log_reasoning_tokens_info(_metadata_new(125)['usage_metadata'])
     
     # Test real-world example from your output
     print("🌍 Testing real-world example (based on your output):")
@@ -107,5 +111,145 @@ def test_logging_functions():
     
     print("\n✅ All logging function tests completed!")
 
+def test_request_messages_are_packed():
+    """Test that dict messages are converted to (role, content) tuples on construction."""
+    request = InvokeRequest(messages=[{"role": "user", "content": "Hi"}, {"content": "No role"}])
+    
+    assert request.messages == (Message("user", "Hi"), Message("unknown", "No role"))
+    
+    from agents._message_utils import convert_messages
+    assert [m.type for m in convert_messages(request.messages)] == ["human", "human"]
+
+def test_log_levels(monkeypatch, capsys):
+    """Test that CHAT_LOG=0 silences the reports and CHAT_LOG=metrics keeps only token counts."""
+    import utils.logging_utils as logging_utils
+    request = InvokeRequest(messages=[{"role": "user", "content": "Secret question"}])
+    
+    monkeypatch.setattr(logging_utils, "_LOG_METRICS_ONLY", True)
+    log_request_details(request)
+    log_model_response("Secret answer", _metadata_new(125))
+    output = capsys.readouterr().out
+    assert "Secret" not in output
+    assert "Reasoning tokens: 125" in output
+    
+    monkeypatch.setattr(logging_utils, "_LOG_ENABLED", False)
+    log_request_details(request)
+    log_model_response("Secret answer", _metadata_new(125))
+    log_reasoning_tokens_info(_metadata_new(125)['usage_metadata'])
+    assert capsys.readouterr().out == ""
+
+def test_background_log_writer(capsys):
+    """Test that reports queued for the background writer are all written by stop_log_writer."""
+    from utils.logging_utils import start_log_writer, stop_log_writer
+    
+    start_log_writer()
+    try:
+        for _ in range(3):
+            log_reasoning_tokens_info({})
+    finally:
+        stop_log_writer()
+    
+    assert capsys.readouterr().out.count("No usage metadata available") == 3
+
+def test_log_requests_bulk(capsys):
+    """Test that a bulk log writes the same reports as logging each request on its own."""
+    from utils.logging_utils import log_requests_bulk
+    requests = [
+        InvokeRequest(messages=[{"role": "user", "content": f"Question {i}"}], model_name=f"model-{i}")
+        for i in range(3)
+    ]
+    
+    for request in requests:
+        log_request_details(request)
+    expected = capsys.readouterr().out
+    
+    log_requests_bulk(requests)
+    assert capsys.readouterr().out == expected
+
+def test_request_details_json(monkeypatch, capsys):
+    """Test that CHAT_LOG_FORMAT=json writes each request as one JSON line."""
+    import json
+    import utils.logging_utils as logging_utils
+    monkeypatch.setattr(logging_utils, "_LOG_JSON", True)
+    
+    log_request_details(InvokeRequest(messages=[{"role": "user", "content": "Hi"}], temperature=0.2))
+    
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["event"] == "request"
+    assert record["temperature"] == 0.2
+    assert record["messages"] == [{"role": "user", "content": "Hi"}]
+
+def test_model_response_json(monkeypatch, capsys):
+    """Test that CHAT_LOG_FORMAT=json writes each response as one JSON line with its token usage."""
+    import json
+    import utils.logging_utils as logging_utils
+    monkeypatch.setattr(logging_utils, "_LOG_JSON", True)
+    
+    log_model_response("Answer", _metadata_new(125))
+    
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["event"] == "response"
+    assert record["content"] == "Answer"
+    assert record["usage"]["reasoning_tokens"] == 125
+
+def test_long_message_content_is_truncated(monkeypatch, capsys):
+    """Test that message content beyond CHAT_LOG_CONTENT_MAX is clipped with a marker."""
+    import utils.logging_utils as logging_utils
+    monkeypatch.setattr(logging_utils, "_LOG_CONTENT_MAX", 10)
+    
+    log_request_details(InvokeRequest(messages=[{"role": "user", "content": "0123456789abcdef"}]))
+    
+    assert "Content: 0123456789... <+6 chars truncated>" in capsys.readouterr().out
+
+def test_queue_logging_setup_is_idempotent():
+    """Test that repeated setup installs one root handler and stopping removes it."""
+    import logging
+    from utils.logging_utils import setup_queue_logging, stop_queue_logging
+    root_handlers = list(logging.getLogger().handlers)
+    
+    try:
+        listener = setup_queue_logging()
+        assert setup_queue_logging() is listener
+        assert len(logging.getLogger().handlers) == len(root_handlers) + 1
+    finally:
+        stop_queue_logging()
+    
+    assert logging.getLogger().handlers == root_handlers
+
+def test_reports_emitted_during_writer_shutdown_are_written(capsys):
+    """Test that no report is lost when the writer stops while other threads are logging."""
+    import threading
+    from utils.logging_utils import start_log_writer, stop_log_writer
+    
+    def emit_reports():
+        for _ in range(200):
+            log_reasoning_tokens_info({})
+    
+    start_log_writer()
+    threads = [threading.Thread(target=emit_reports) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    stop_log_writer()
+    for thread in threads:
+        thread.join()
+    
+    assert capsys.readouterr().out.count("No usage metadata available") == 800
+
+@pytest.mark.parametrize("builder", [_metadata_new, _metadata_legacy, _metadata_typed])
+def test_log_response_with_reasoning(builder, capsys):
+    """Test that reasoning tokens are detected in every supported metadata shape."""
+    log_model_response("After thinking about this question deeply, I believe the meaning of life involves finding purpose.", builder(125))
+    
+    output = capsys.readouterr().out
+    assert "Reasoning tokens: 125" in output
+    assert "Reasoning ratio: 67.6% of total tokens" in output
+
 if __name__ == "__main__":
-    test_logging_functions() 
\ No newline at end of file
+    test_logging_functions()
+    for builder in (_metadata_new, _metadata_legacy, _metadata_typed):
+        print(f"🧠 Testing response WITH reasoning tokens ({builder.__name__}):")
+        log_model_response("Reasoning format test response.", builder(125)) 
\ No newline at end of file
@@ -4,6 +4,9 @@ Very simple test for just the Pydantic models
 import pytest
 from datetime import datetime
 
+# Fixed timestamp, so the models built from it are deterministic
+NOW = datetime(2024, 1, 1, 0, 0, 0)
+
 def test_research_models():
     """Test that we can import and use the research models"""
     try:
@@ -37,7 +40,7 @@ def test_research_models():
             anonymized_queries=["python testing"],
             selected_documents=[search_result],
             total_documents_found=1,
-            research_timestamp=datetime.now()
+            research_timestamp=NOW
         )
         assert len(research_output.selected_documents) == 1
         assert research_output.total_documents_found == 1
@@ -1,10 +1,23 @@
 """
 Simple test file for ResearchAgent basic functionality
 """
+import re
 import pytest
 from datetime import datetime
 from agents.models.research_models import ResearchInput, ResearchOutput, SearchResult
 
+# Fixed timestamp, so the models built from it are deterministic
+NOW = datetime(2024, 1, 1, 0, 0, 0)
+
+# Anonymization patterns fused into one alternation, compiled once for every
+# simple_anonymize call; each group name is its placeholder
+_ANON_RE = re.compile(
+    r'(?P<EMAIL>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    r'|(?P<PHONE>\b\d{3}[-.]?\d{3}[-.]?\d{4}\b)'
+    r'|(?P<URL>https?://[^\s]+)'
+)
+_DOMAIN_RE = re.compile(r'^https?://([^/?#]+)', re.IGNORECASE)
+
 def test_research_input_model():
     """Test ResearchInput Pydantic model"""
     research_input = ResearchInput(
@@ -78,7 +91,7 @@ def test_research_output_model():
         anonymized_queries=["python testing best practices", "unit testing guide"],
         selected_documents=search_results,
         total_documents_found=5,
-        research_timestamp=datetime.now()
+        research_timestamp=NOW
     )
     
     assert research_output.original_objective == "Find testing best practices"
@@ -88,17 +101,11 @@ def test_research_output_model():
 
 def test_regex_anonymization():
     """Test basic regex anonymization patterns"""
-    import re
     
     def simple_anonymize(text):
         """Simple anonymization function for testing"""
-        # Email addresses
-        text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL]', text)
-        # Phone numbers
-        text = re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE]', text)
-        # URLs
-        text = re.sub(r'https?://[^\s]+', '[URL]', text)
-        return text
+        # Email addresses, phone numbers and URLs in a single scan
+        return _ANON_RE.sub(lambda m: f'[{m.lastgroup}]', text)
     
     test_text = """
     Contact John at john.doe@company.com or call 555-123-4567.
@@ -116,15 +123,11 @@ def test_regex_anonymization():
 
 def test_domain_extraction():
     """Test URL domain extraction logic"""
-    from urllib.parse import urlparse
     
     def extract_domain(url):
         """Simple domain extraction for testing"""
-        try:
-            parsed = urlparse(url)
-            return parsed.netloc
-        except:
-            return "unknown"
+        match = _DOMAIN_RE.match(url)
+        return match.group(1) if match else "unknown"
     
     test_cases = [
         ("https://www.example.com/path", "www.example.com"),
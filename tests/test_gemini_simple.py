@@ -1,16 +1,32 @@
+import os
+import httpx
 import pytest
-import requests
+import pytest_asyncio
+from main import app
 
-# Use the actual running server
-BASE_URL = "http://localhost:8000"
+@pytest_asyncio.fixture
+async def client():
+    """Client calling the app in-process through its ASGI interface, no running server needed"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as c:
+        yield c
 
-def test_gemini_endpoint_basic():
-    # Send a simple message to the actual running API
-    response = requests.post(f"{BASE_URL}/invoke_agent", json={
+@pytest.mark.asyncio
+async def test_health(client):
+    response = await client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("GEMINI_API_KEY"), reason="GEMINI_API_KEY not available")
+async def test_gemini_endpoint_basic(client):
+    # Send a simple message through the app
+    response = await client.post("/invoke_agent", json={
         "messages": [{"role": "user", "content": "Hello, how are you?"}]
     })
-    
+
     # Verify the response
     assert response.status_code == 200
     assert "response" in response.json()
-    assert len(response.json()["response"]) > 0  # Just check that there's some text response 
\ No newline at end of file
+    assert len(response.json()["response"]) > 0  # Just check that there's some text response
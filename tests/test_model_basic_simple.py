@@ -4,88 +4,52 @@ from unittest.mock import patch
 from dotenv import load_dotenv
 from agents.model_basic import ModelBasic
 
+# Per provider: (minimum length, required prefix, rejected prefix, rejected placeholder keys)
+_VALIDATORS = {
+    "google": (10, "", "test", frozenset({"adasdsad"})),
+    "openai": (20, "sk-", "", frozenset()),
+    "anthropic": (10, "", "test", frozenset({"adasdsad"})),
+}
+
 def is_valid_api_key(api_key, provider):
     """Check if API key appears to be valid (basic validation)."""
-    if not api_key:
+    cfg = _VALIDATORS.get(provider)
+    if cfg is None or not api_key:
         return False
     
     # Basic format validation
-    if provider == "google":
-        return len(api_key) > 10 and not api_key.startswith("test") and api_key != "adasdsad"
-    elif provider == "openai":
-        return api_key.startswith("sk-") and len(api_key) > 20
-    elif provider == "anthropic":
-        return len(api_key) > 10 and not api_key.startswith("test") and api_key != "adasdsad"
-    
-    return False
+    min_len, prefix, rejected_prefix, blacklist = cfg
+    return (
+        len(api_key) > min_len
+        and api_key.startswith(prefix)
+        and not (rejected_prefix and api_key.startswith(rejected_prefix))
+        and api_key not in blacklist
+    )
+
+@pytest.fixture(scope="session", autouse=True)
+def load_env():
+    """Load environment variables from .env.local once for the whole session."""
+    load_dotenv(".env.local")
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def disable_langfuse():
     """Fixture to disable Langfuse during tests to avoid error messages."""
-    with patch('agents.model_basic.get_langfuse_callbacks', return_value=[]):
+    with patch('agents._chat_base.get_langfuse_callbacks', return_value=[]):
         yield
 
-def test_google_provider(disable_langfuse):
-    """Test that Google provider works and returns valid text."""
-    # Load environment variables from .env.local
-    load_dotenv(".env.local")
-    
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not is_valid_api_key(api_key, "google"):
-        pytest.skip("Valid GEMINI_API_KEY not found in environment")
-    
-    # Instantiate the agent with Google provider
-    agent = ModelBasic(model_provider="google")
-    
-    # Test with a simple query
-    messages = [{"role": "user", "content": "Say hello in one word"}]
-    response = agent.invoke_completion(messages)
-    
-    # Basic assertions
-    assert response is not None
-    assert isinstance(response, str)
-    assert len(response) > 0
-    assert response != "No messages provided."
-    assert response != "An error occurred while processing your request."
-    
-    print(f"Google response: {response}")
-
-def test_openai_provider(disable_langfuse):
-    """Test that OpenAI provider works and returns valid text."""
-    # Load environment variables from .env.local
-    load_dotenv(".env.local")
-    
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not is_valid_api_key(api_key, "openai"):
-        pytest.skip("Valid OPENAI_API_KEY not found in environment")
-    
-    # Instantiate the agent with OpenAI provider
-    agent = ModelBasic(model_provider="openai")
-    
-    # Test with a simple query
-    messages = [{"role": "user", "content": "Say hello in one word"}]
-    response = agent.invoke_completion(messages)
-    
-    # Basic assertions
-    assert response is not None
-    assert isinstance(response, str)
-    assert len(response) > 0
-    assert response != "No messages provided."
-    assert response != "An error occurred while processing your request."
-    
-    print(f"OpenAI response: {response}")
-
-def test_anthropic_provider(disable_langfuse):
-    """Test that Anthropic provider works and returns valid text."""
-    # Load environment variables from .env.local
-    load_dotenv(".env.local")
-    
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not is_valid_api_key(api_key, "anthropic"):
-        pytest.skip("Valid ANTHROPIC_API_KEY not found in environment")
-    
-    # Instantiate the agent with Anthropic provider
-    agent = ModelBasic(model_provider="anthropic")
+@pytest.mark.parametrize("provider,env_key", [
+    ("google", "GEMINI_API_KEY"),
+    ("openai", "OPENAI_API_KEY"),
+    ("anthropic", "ANTHROPIC_API_KEY"),
+])
+def test_provider(provider, env_key, disable_langfuse):
+    """Test that each provider works and returns valid text."""
+    api_key = os.getenv(env_key)
+    if not is_valid_api_key(api_key, provider):
+        pytest.skip(f"Valid {env_key} not found in environment")
+    
+    # Instantiate the agent with the provider under test
+    agent = ModelBasic(model_provider=provider)
     
     # Test with a simple query
     messages = [{"role": "user", "content": "Say hello in one word"}]
@@ -98,9 +62,72 @@ def test_anthropic_provider(disable_langfuse):
     assert response != "No messages provided."
     assert response != "An error occurred while processing your request."
     
-    print(f"Anthropic response: {response}")
+    print(f"{provider} response: {response}")
 
 def test_unsupported_provider():
     """Test that unsupported provider raises ValueError."""
     with pytest.raises(ValueError, match="Unsupported model provider: invalid"):
-        ModelBasic(model_provider="invalid") 
\ No newline at end of file
+        ModelBasic(model_provider="invalid") 
+
+def test_low_temperature_responses_are_cached(disable_langfuse, monkeypatch):
+    """Test that identical requests at low temperature are served from the cache."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    agent = ModelBasic(model_provider="google", temperature=0.0)
+    agent.llm = FakeListChatModel(responses=["first", "second"])
+
+    messages = [{"role": "user", "content": "Say hello in one word"}]
+    assert agent.invoke_completion(messages) == "first"
+    assert agent.invoke_completion(messages) == "first"
+    assert agent.invoke_completion([{"role": "user", "content": "Something else"}]) == "second"
+
+def test_cache_hits_report_no_token_usage(disable_langfuse, monkeypatch):
+    """Test that a cache hit returns marked metadata without the original call's usage."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from langchain_core.messages import AIMessage
+
+    class UsageLLM(FakeListChatModel):
+        def invoke(self, *args, **kwargs):
+            return AIMessage(content="answer", usage_metadata={"input_tokens": 3, "output_tokens": 2, "total_tokens": 5})
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    agent = ModelBasic(model_provider="google", temperature=0.0)
+    agent.llm = UsageLLM(responses=[""])
+
+    messages = [{"role": "user", "content": "Count my tokens once"}]
+    _, first = agent.invoke_completion_with_metadata(messages)
+    _, second = agent.invoke_completion_with_metadata(messages)
+
+    assert first["usage_metadata"]["total_tokens"] == 5
+    assert "usage_metadata" not in second
+    assert second["cached"] is True
+    assert "cached" not in first
+
+def test_adjacent_same_role_messages_are_merged():
+    """Test that adjacent same-role messages are merged only when requested."""
+    from agents._message_utils import convert_messages
+
+    messages = [
+        {"role": "user", "content": "Hello"},
+        {"role": "user", "content": "Are you there?"},
+        {"role": "assistant", "content": "Yes"},
+    ]
+    merged = convert_messages(messages, merge_same_role=True)
+    assert [m.type for m in merged] == ["human", "ai"]
+    assert merged[0].content == "Hello\n\nAre you there?"
+
+    assert len(convert_messages(messages)) == 3
+
+def test_messages_with_tool_calls_are_not_merged():
+    """Test that merging keeps an AI message carrying tool calls intact."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    from agents._message_utils import convert_messages
+
+    tool_call = {"name": "search", "args": {"query": "q"}, "id": "call_1"}
+    messages = [HumanMessage("q"), AIMessage("", tool_calls=[tool_call]), AIMessage("done")]
+    merged = convert_messages(messages, merge_same_role=True)
+
+    assert [m.type for m in merged] == ["human", "ai", "ai"]
+    assert merged[1].tool_calls[0]["id"] == "call_1"
+    assert merged[2].content == "done"
@@ -1,8 +1,24 @@
 # Utils package for shared utilities
-from .logging_utils import log_model_response, log_request_details, log_reasoning_tokens_info
+from .logging_utils import (
+    log_model_response,
+    log_model_response_json,
+    log_request_details,
+    log_requests_bulk,
+    log_reasoning_tokens_info,
+    setup_queue_logging,
+    stop_queue_logging,
+    start_log_writer,
+    stop_log_writer,
+)
 
 __all__ = [
     "log_model_response",
+    "log_model_response_json",
     "log_request_details", 
-    "log_reasoning_tokens_info"
+    "log_requests_bulk",
+    "log_reasoning_tokens_info",
+    "setup_queue_logging",
+    "stop_queue_logging",
+    "start_log_writer",
+    "stop_log_writer"
 ] 
\ No newline at end of file
@@ -1,121 +1,513 @@
 """
 Logging utilities for model requests and responses.
 """
-from typing import Dict, Any, Optional
-from pydantic import BaseModel
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Optional, Tuple, Union
 from typing import List
+import orjson
 
+if TYPE_CHECKING:
+    from .request_models import InvokeRequest, Message
 
-class InvokeRequest(BaseModel):
-    """Request model for invoke endpoints - redefined here to avoid circular imports"""
-    messages: List[Dict[str, Any]]
-    temperature: Optional[float] = 0.7
-    top_p: Optional[float] = 1.0
-    model_name: Optional[str] = "gemini-2.0-flash"
-    model_provider: Optional[str] = "google"
 
+# Buffered report text that forces an intermediate write, so one oversized
+# response cannot grow the buffer without bound
+_LOG_BUFFER_SOFT_CAP = 64 * 1024
 
-def log_model_response(response_content: str, response_metadata: Optional[Dict] = None) -> None:
+# LOG_FLUSH=1 flushes stdout after every report; by default the stream's own
+# buffering decides (line-buffered on a terminal, unbuffered with PYTHONUNBUFFERED)
+_LOG_FLUSH = os.getenv("LOG_FLUSH", "0") == "1"
+
+# CHAT_LOG=0 turns the request/response reports off entirely; CHAT_LOG=metrics keeps
+# only the token counts, skipping request details and response text.
+# CHAT_LOG_METADATA=0 drops the raw response metadata line from the full report.
+_CHAT_LOG = os.getenv("CHAT_LOG", "1")
+_LOG_ENABLED = _CHAT_LOG != "0"
+_LOG_METRICS_ONLY = _CHAT_LOG == "metrics"
+_LOG_METADATA = os.getenv("CHAT_LOG_METADATA", "1") != "0"
+# CHAT_LOG_FORMAT=json writes each report as one JSON line instead of the pretty block
+_LOG_JSON = os.getenv("CHAT_LOG_FORMAT", "pretty") == "json"
+# Report markers; ASCII by default, CHAT_LOG_EMOJI=1 restores the emoji. Each marker
+# carries its trailing space so the ASCII form is simply empty.
+if os.getenv("CHAT_LOG_EMOJI", "0") == "1":
+    _M_ANALYSIS, _M_INPUT, _M_OUTPUT, _M_TOTAL = "🔍 ", "📥 ", "📤 ", "📊 "
+    _M_REASONING, _M_RATIO, _M_INSIGHT, _M_NONE = "🧠 ", "📈 ", "💡 ", "🚫 "
+else:
+    _M_ANALYSIS = _M_INPUT = _M_OUTPUT = _M_TOTAL = ""
+    _M_REASONING = _M_RATIO = _M_INSIGHT = _M_NONE = ""
+# Longest message content written to a request report, in characters; 0 disables the cap
+_LOG_CONTENT_MAX = int(os.getenv("CHAT_LOG_CONTENT_MAX", "4096"))
+
+# Reports waiting for the background writer; None while no writer runs
+_LOG_QUEUE_MAX = 8192
+_log_queue: "Optional[queue.Queue[Optional[str]]]" = None
+_log_writer: Optional[threading.Thread] = None
+# Guards swapping _log_queue against reports being enqueued on it
+_log_queue_lock = threading.Lock()
+
+# Handler and listener installed on the root logger by setup_queue_logging
+_queue_handler: Optional[QueueHandler] = None
+_queue_listener: Optional[QueueListener] = None
+
+# Reports discarded because the writer queue was full
+dropped_logs = 0
+_dropped_lock = threading.Lock()
+
+
+def _write_stdout(text: str) -> None:
+    sys.stdout.write(text)
+    if _LOG_FLUSH:
+        sys.stdout.flush()
+
+
+def _emit(text: str) -> None:
+    """Hand a finished report to the background writer, or write it directly when none runs."""
+    global dropped_logs
+    # Reading the queue and enqueuing happen under one lock, so stop_log_writer
+    # cannot detach the queue in between and leave a report behind its sentinel
+    with _log_queue_lock:
+        log_queue = _log_queue
+        if log_queue is not None:
+            try:
+                log_queue.put_nowait(text)
+                return
+            except queue.Full:
+                # Never block the caller on a slow stdout; count the loss instead
+                with _dropped_lock:
+                    dropped_logs += 1
+                return
+    _write_stdout(text)
+
+
+def _drain_log_queue(log_queue: "queue.Queue[Optional[str]]") -> None:
+    """Writer thread: coalesces queued reports into writes of up to _LOG_BUFFER_SOFT_CAP."""
+    reported_drops = 0
+    stopping = False
+    while not stopping:
+        text = log_queue.get()
+        if text is None:
+            break
+        parts = [text]
+        size = len(text)
+        while size < _LOG_BUFFER_SOFT_CAP:
+            try:
+                text = log_queue.get_nowait()
+            except queue.Empty:
+                break
+            if text is None:
+                stopping = True
+                break
+            parts.append(text)
+            size += len(text)
+        drops = dropped_logs
+        if drops != reported_drops:
+            parts.append(f"[logging] {drops - reported_drops} log reports dropped, writer queue full\n")
+            reported_drops = drops
+        _write_stdout("".join(parts))
+
+
+def start_log_writer(maxsize: int = _LOG_QUEUE_MAX) -> None:
+    """
+    Move stdout writes of the log reports to a background thread.
+
+    Logging calls then only format their report and enqueue it. When the queue
+    is full the report is dropped and counted in dropped_logs; the writer notes
+    the count in the output. Without a running writer reports are written
+    synchronously.
+    
+    Args:
+        maxsize: Maximum number of reports waiting to be written
+    """
+    global _log_queue, _log_writer
+    if _log_writer is not None:
+        return
+    log_queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize)
+    _log_writer = threading.Thread(target=_drain_log_queue, args=(log_queue,), name="log-writer", daemon=True)
+    _log_writer.start()
+    with _log_queue_lock:
+        _log_queue = log_queue
+
+
+def stop_log_writer() -> None:
+    """Write out all queued reports and stop the background writer."""
+    global _log_queue, _log_writer
+    with _log_queue_lock:
+        log_queue, writer = _log_queue, _log_writer
+        if writer is None:
+            return
+        _log_queue, _log_writer = None, None
+    # Every report enqueued before the swap is ahead of the sentinel
+    log_queue.put(None)
+    writer.join()
+
+
+class _LogBuffer:
+    """Collects the lines of one log report and writes them to stdout in a single call."""
+    __slots__ = ("_lines", "_size")
+
+    def __init__(self) -> None:
+        self._lines: List[str] = []
+        self._size = 0
+
+    def append(self, line: str) -> None:
+        """Queue one line, as print() would have written it."""
+        self._lines.append(line)
+        self._size += len(line) + 1
+        if self._size >= _LOG_BUFFER_SOFT_CAP:
+            self.flush()
+
+    def flush(self) -> None:
+        """Emit all queued lines as one write, flushing stdout only if LOG_FLUSH is set."""
+        if self._lines:
+            _emit("\n".join(self._lines) + "\n")
+            self._lines.clear()
+            self._size = 0
+
+
+def __getattr__(name: str) -> Any:
+    # The request models used to live here; load them on first access so importing
+    # the loggers does not build pydantic models
+    if name in ("InvokeRequest", "Message"):
+        from . import request_models
+        return getattr(request_models, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass(slots=True, frozen=True)
+class UsageMetadata:
+    """Token counts of one model response, with reasoning tokens already resolved."""
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+    reasoning: int = 0
+
+    @classmethod
+    def from_dict(cls, usage_metadata: Dict[str, Any]) -> "UsageMetadata":
+        """Flattens a LangChain usage_metadata dict."""
+        # LangChain always sets the three counts, so index them directly and only
+        # fall back to defaults when a provider leaves one out
+        try:
+            input_tokens = usage_metadata['input_tokens']
+            output_tokens = usage_metadata['output_tokens']
+            total_tokens = usage_metadata['total_tokens']
+        except KeyError:
+            input_tokens = usage_metadata.get('input_tokens', 0)
+            output_tokens = usage_metadata.get('output_tokens', 0)
+            total_tokens = usage_metadata.get('total_tokens', 0)
+
+        # Reasoning tokens live in output_token_details (LangChain standard format);
+        # fall back to the legacy 'thoughts_token_count' only when they are absent
+        try:
+            reasoning = usage_metadata['output_token_details']['reasoning']
+        except (KeyError, TypeError):
+            reasoning = 0
+        if not reasoning:
+            reasoning = usage_metadata.get('thoughts_token_count', 0)
+
+        return cls(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=total_tokens,
+            reasoning=reasoning,
+        )
+
+    @property
+    def reasoning_ratio(self) -> float:
+        """Reasoning tokens as a percentage of total tokens, 0 when the total is unknown."""
+        return (self.reasoning / self.total_tokens) * 100 if self.total_tokens > 0 else 0
+
+
+@dataclass(slots=True, frozen=True)
+class ResponseMetadata:
+    """The parts of a model response's metadata that the logger reports."""
+    usage_metadata: Optional[UsageMetadata] = None
+    finish_reason: Optional[str] = None
+    model_name: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, response_metadata: Dict[str, Any]) -> "ResponseMetadata":
+        """Builds the logged view of a response_metadata dict."""
+        usage_metadata = response_metadata.get('usage_metadata')
+        return cls(
+            usage_metadata=UsageMetadata.from_dict(usage_metadata) if usage_metadata else None,
+            finish_reason=response_metadata.get('finish_reason'),
+            model_name=response_metadata.get('model_name'),
+        )
+
+
+def setup_queue_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Route the standard logging module through a queue drained by a background thread.
+
+    Request threads only enqueue records; formatting and stream I/O happen on the
+    listener thread. Calling it again while installed returns the running listener
+    instead of stacking another handler on the root logger.
+    
+    Args:
+        level: Minimum level for the root logger
+        
+    Returns:
+        The started listener. Call stop_queue_logging() on shutdown to flush
+        pending records and detach the handler.
+    """
+    global _queue_handler, _queue_listener
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    if _queue_listener is not None:
+        return _queue_listener
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    handler = QueueHandler(log_queue)
+    
+    root_logger.addHandler(handler)
+    listener.start()
+    _queue_handler, _queue_listener = handler, listener
+    return listener
+
+
+def stop_queue_logging() -> None:
+    """Detach the queue handler from the root logger and write out pending records."""
+    global _queue_handler, _queue_listener
+    handler, listener = _queue_handler, _queue_listener
+    if listener is None:
+        return
+    _queue_handler, _queue_listener = None, None
+    logging.getLogger().removeHandler(handler)
+    listener.stop()
+
+
+def log_model_response(response_content: str,
+                       response_metadata: Optional[Union[Dict, ResponseMetadata]] = None) -> None:
     """
     Log the model response and reasoning tokens if available.
     
     Args:
         response_content: The response content from the model
-        response_metadata: Optional metadata from the model response
+        response_metadata: Optional metadata from the model response, as the raw
+            dict or an already built ResponseMetadata
     """
-    print("\n=== Model Response ===")
-    print(f"Response Content: {response_content}")
+    if not _LOG_ENABLED:
+        return
+    if _LOG_JSON:
+        log_model_response_json(response_content, response_metadata)
+        return
+    
+    buf = _LogBuffer()
+    buf.append("\n=== Model Response ===")
+    if not _LOG_METRICS_ONLY:
+        buf.append(f"Response Content: {response_content}")
     
     if response_metadata:
-        print(f"Response Metadata: {response_metadata}")
+        if _LOG_METADATA and not _LOG_METRICS_ONLY:
+            buf.append(f"Response Metadata: {response_metadata}")
         
-        # Check for reasoning/thinking tokens in usage metadata using LangChain standard format
-        usage_metadata = response_metadata.get('usage_metadata', {})
-        if usage_metadata:
-            input_tokens = usage_metadata.get('input_tokens', 0)
-            output_tokens = usage_metadata.get('output_tokens', 0)
-            total_tokens = usage_metadata.get('total_tokens', 0)
-            
-            # Get reasoning tokens from output_token_details (LangChain standard format)
-            output_token_details = usage_metadata.get('output_token_details', {})
-            reasoning_tokens = output_token_details.get('reasoning', 0) if output_token_details else 0
-            
-            # Also check for legacy 'thoughts_token_count' for backward compatibility
-            legacy_thoughts_tokens = usage_metadata.get('thoughts_token_count', 0)
-            
-            # Use reasoning tokens if available, otherwise fall back to legacy format
-            actual_reasoning_tokens = reasoning_tokens if reasoning_tokens > 0 else legacy_thoughts_tokens
+        # Only the usage counts are reported, so a raw dict is not converted to a
+        # full ResponseMetadata, and one without usage_metadata skips the block
+        if isinstance(response_metadata, dict):
+            usage_metadata = response_metadata.get('usage_metadata')
+            usage = UsageMetadata.from_dict(usage_metadata) if usage_metadata else None
+        else:
+            usage = response_metadata.usage_metadata
+        
+        # Check for reasoning/thinking tokens in usage metadata
+        if usage is not None:
+            total_tokens = usage.total_tokens
+            actual_reasoning_tokens = usage.reasoning
             
-            print(f"Token Usage:")
-            print(f"  Input tokens: {input_tokens}")
-            print(f"  Output tokens: {output_tokens}")
-            print(f"  Total tokens: {total_tokens}")
+            # Each fixed block is a single multi-line f-string: one format and one
+            # buffer entry instead of one per line
+            buf.append(
+                f"Token Usage:\n"
+                f"  Input tokens: {usage.input_tokens}\n"
+                f"  Output tokens: {usage.output_tokens}\n"
+                f"  Total tokens: {total_tokens}"
+            )
             
             if actual_reasoning_tokens > 0:
-                print(f"  🧠 Reasoning tokens: {actual_reasoning_tokens}")
-                reasoning_ratio = (actual_reasoning_tokens / total_tokens) * 100 if total_tokens > 0 else 0
-                print(f"  📈 Reasoning ratio: {reasoning_ratio:.1f}% of total tokens")
-                print(f"  💡 Model used reasoning process!")
+                reasoning_ratio = usage.reasoning_ratio
+                buf.append(
+                    f"  {_M_REASONING}Reasoning tokens: {actual_reasoning_tokens}\n"
+                    f"  {_M_RATIO}Reasoning ratio: {reasoning_ratio:.1f}% of total tokens\n"
+                    f"  {_M_INSIGHT}Model used reasoning process!"
+                )
             else:
-                print(f"  No reasoning tokens detected")
+                buf.append(f"  No reasoning tokens detected")
+    
+    buf.append("===================\n")
+    buf.flush()
+
+
+def log_model_response_json(response_content: Any,
+                            response_metadata: Optional[Union[Dict, ResponseMetadata]] = None) -> None:
+    """
+    Log the model response as a single JSON line, for log pipelines that index records.
+    
+    log_model_response delegates here when CHAT_LOG_FORMAT=json.
     
-    print("===================\n")
+    Args:
+        response_content: The response content from the model
+        response_metadata: Optional metadata from the model response, as the raw
+            dict or an already built ResponseMetadata
+    """
+    if not _LOG_ENABLED:
+        return
+    
+    if isinstance(response_metadata, dict):
+        response_metadata = ResponseMetadata.from_dict(response_metadata)
+    record: Dict[str, Any] = {"event": "response", "ts": time.time_ns()}
+    if not _LOG_METRICS_ONLY:
+        record["content"] = response_content
+    if response_metadata is not None:
+        record["finish_reason"] = response_metadata.finish_reason
+        record["model_name"] = response_metadata.model_name
+        usage = response_metadata.usage_metadata
+        if usage is not None:
+            record["usage"] = {
+                "input_tokens": usage.input_tokens,
+                "output_tokens": usage.output_tokens,
+                "total_tokens": usage.total_tokens,
+                "reasoning_tokens": usage.reasoning,
+            }
+    _emit(orjson.dumps(record, default=str, option=orjson.OPT_APPEND_NEWLINE).decode())
+
+
+def _message_fields(msg: Union[Dict[str, Any], "Message"], content_max: int) -> Tuple[Any, Any]:
+    """Returns the (role, content) of a packed Message or a plain dict message, content clipped to content_max."""
+    # Requests parsed by the API still carry plain dict messages
+    if isinstance(msg, dict):
+        role, content = msg.get('role', 'unknown'), msg.get('content', '')
+    else:
+        role, content = msg
+    # Clip pasted documents so one large message cannot flood the report
+    if content_max > 0 and isinstance(content, str) and len(content) > content_max:
+        content = f"{content[:content_max]}... <+{len(content) - content_max} chars truncated>"
+    return role, content
+
+
+def _render_request(request: "InvokeRequest", content_max: int) -> str:
+    """Formats the details report of one request."""
+    report = (
+        f"\n=== Request Details ===\n"
+        f"Model Provider: {request.model_provider}\n"
+        f"Model Name: {request.model_name}\n"
+        f"Temperature: {request.temperature}\n"
+        f"Top P: {request.top_p}\n"
+        f"\nMessages:"
+    )
+    messages = request.messages
+    if messages:
+        # The whole history is formatted as one block instead of three lines per message
+        report += "\n" + "\n".join(
+            f"  Message {i}:\n    Role: {role}\n    Content: {content}"
+            for i, (role, content) in enumerate((_message_fields(m, content_max) for m in messages), 1)
+        )
+    return report + "\n===================\n"
 
 
-def log_request_details(request: InvokeRequest) -> None:
+def _render_request_json(request: "InvokeRequest") -> str:
+    """Serializes the details report of one request as a single JSON line."""
+    return orjson.dumps({
+        "event": "request",
+        "ts": time.time_ns(),
+        "model_provider": request.model_provider,
+        "model_name": request.model_name,
+        "temperature": request.temperature,
+        "top_p": request.top_p,
+        "messages": [
+            {"role": role, "content": content}
+            for role, content in (_message_fields(m, _LOG_CONTENT_MAX) for m in request.messages)
+        ],
+    }, default=str).decode()
+
+
+def _format_request(buf: _LogBuffer, request: "InvokeRequest") -> None:
+    """Appends the details report of one request to buf."""
+    if _LOG_JSON:
+        buf.append(_render_request_json(request))
+        return
+    buf.append(_render_request(request, _LOG_CONTENT_MAX))
+
+
+def log_request_details(request: "InvokeRequest") -> None:
     """
     Log the request details.
     
     Args:
         request: The invoke request object
     """
-    print("\n=== Request Details ===")
-    print(f"Model Provider: {request.model_provider}")
-    print(f"Model Name: {request.model_name}")
-    print(f"Temperature: {request.temperature}")
-    print(f"Top P: {request.top_p}")
-    print("\nMessages:")
-    for i, msg in enumerate(request.messages, 1):
-        print(f"  Message {i}:")
-        print(f"    Role: {msg.get('role', 'unknown')}")
-        print(f"    Content: {msg.get('content', '')}")
-    print("===================\n")
-
-
-def log_reasoning_tokens_info(usage_metadata: Dict[str, Any]) -> None:
+    if not _LOG_ENABLED or _LOG_METRICS_ONLY:
+        return
+    
+    buf = _LogBuffer()
+    _format_request(buf, request)
+    buf.flush()
+
+
+def log_requests_bulk(requests: Iterable["InvokeRequest"]) -> None:
     """
-    Extract and log reasoning tokens information from usage metadata.
+    Log the details of many requests, e.g. when replaying a conversation history.
+    
+    The reports share one buffer, so they are written in as few calls as the
+    buffer's soft cap allows instead of one write per request.
     
     Args:
-        usage_metadata: Usage metadata dictionary from model response
+        requests: The invoke request objects, logged in order
     """
-    if not usage_metadata:
-        print("No usage metadata available")
+    if not _LOG_ENABLED or _LOG_METRICS_ONLY:
         return
     
-    input_tokens = usage_metadata.get('input_tokens', 0)
-    output_tokens = usage_metadata.get('output_tokens', 0)
-    total_tokens = usage_metadata.get('total_tokens', 0)
+    buf = _LogBuffer()
+    for request in requests:
+        _format_request(buf, request)
+    buf.flush()
+
+
+def log_reasoning_tokens_info(usage_metadata: Optional[Union[Dict[str, Any], UsageMetadata]]) -> None:
+    """
+    Extract and log reasoning tokens information from usage metadata.
     
-    # Get reasoning tokens from output_token_details (LangChain standard format)
-    output_token_details = usage_metadata.get('output_token_details', {})
-    reasoning_tokens = output_token_details.get('reasoning', 0) if output_token_details else 0
+    Args:
+        usage_metadata: Usage metadata from model response, as the raw dict
+            or an already built UsageMetadata
+    """
+    if not _LOG_ENABLED:
+        return
     
-    # Also check for legacy 'thoughts_token_count' for backward compatibility
-    legacy_thoughts_tokens = usage_metadata.get('thoughts_token_count', 0)
+    buf = _LogBuffer()
+    if not usage_metadata:
+        buf.append("No usage metadata available")
+        buf.flush()
+        return
     
-    # Use reasoning tokens if available, otherwise fall back to legacy format
-    actual_reasoning_tokens = reasoning_tokens if reasoning_tokens > 0 else legacy_thoughts_tokens
+    if isinstance(usage_metadata, dict):
+        usage_metadata = UsageMetadata.from_dict(usage_metadata)
+    total_tokens = usage_metadata.total_tokens
+    actual_reasoning_tokens = usage_metadata.reasoning
     
-    print("🔍 Token Analysis:")
-    print(f"  📥 Input: {input_tokens} tokens")
-    print(f"  📤 Output: {output_tokens} tokens")
-    print(f"  📊 Total: {total_tokens} tokens")
+    buf.append(
+        f"{_M_ANALYSIS}Token Analysis:\n"
+        f"  {_M_INPUT}Input: {usage_metadata.input_tokens} tokens\n"
+        f"  {_M_OUTPUT}Output: {usage_metadata.output_tokens} tokens\n"
+        f"  {_M_TOTAL}Total: {total_tokens} tokens"
+    )
     
     if actual_reasoning_tokens > 0:
-        print(f"  🧠 Reasoning: {actual_reasoning_tokens} tokens")
-        reasoning_ratio = (actual_reasoning_tokens / total_tokens) * 100 if total_tokens > 0 else 0
-        print(f"  📈 Reasoning ratio: {reasoning_ratio:.1f}% of total tokens")
-        print(f"  💡 Model engaged in reasoning process!")
+        reasoning_ratio = usage_metadata.reasoning_ratio
+        buf.append(
+            f"  {_M_REASONING}Reasoning: {actual_reasoning_tokens} tokens\n"
+            f"  {_M_RATIO}Reasoning ratio: {reasoning_ratio:.1f}% of total tokens\n"
+            f"  {_M_INSIGHT}Model engaged in reasoning process!"
+        )
     else:
-        print(f"  🚫 No reasoning tokens used") 
\ No newline at end of file
+        buf.append(f"  {_M_NONE}No reasoning tokens used")
+    buf.flush()
@@ -0,0 +1,34 @@
+"""
+Request models read by the logging utilities.
+"""
+from typing import Any, NamedTuple, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+class Message(NamedTuple):
+    """A chat message packed as a (role, content) pair."""
+    role: str
+    content: Any
+
+
+class InvokeRequest(BaseModel):
+    """Request model for invoke endpoints - redefined here to avoid circular imports"""
+    # Only ever read by the loggers; frozen models skip per-assignment validation
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    messages: Tuple[Message, ...]
+    temperature: Optional[float] = 0.7
+    top_p: Optional[float] = 1.0
+    model_name: Optional[str] = "gemini-2.0-flash"
+    model_provider: Optional[str] = "google"
+
+    @field_validator("messages", mode="before")
+    @classmethod
+    def _pack_messages(cls, messages: Any) -> Any:
+        """Converts {"role", "content"} dicts to Message tuples once, at construction."""
+        if isinstance(messages, (list, tuple)):
+            return tuple(
+                Message(m.get('role', 'unknown'), m.get('content', '')) if isinstance(m, dict) else m
+                for m in messages
+            )
+        return messages